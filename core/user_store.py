@@ -1,10 +1,11 @@
 # core/user_store.py
 
-import json
 from pathlib import Path
 from datetime import datetime, date
 from typing import Optional, Dict, Any, List
 
+from scripts.user_registry import UserRegistry
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 USERS_DIR = PROJECT_ROOT / "users"
 USERS_DIR.mkdir(exist_ok=True)
@@ -13,18 +14,10 @@ USERS_DIR.mkdir(exist_ok=True)
 class UserStore:
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.path = USERS_DIR / f"{user_id}.json"
-
-        if self.path.exists():
-            self._load()
-        else:
-            self.data = {
-                "user_id": user_id,
-                "date_of_birth": None,
-                "created_utc": self._now(),
-                "voice_versions": []
-            }
-            self._save()
+        # same storage backend as UserRegistry (SQLite by default)
+        self._registry = UserRegistry(user_id)
+        self.backend = self._registry.backend
+        self.data = self._registry.data
 
     # ---------- internal ----------
 
@@ -32,10 +25,11 @@ class UserStore:
         return datetime.utcnow().isoformat() + "Z"
 
     def _load(self):
-        self.data = json.loads(self.path.read_text())
+        self._registry._load()
+        self.data = self._registry.data
 
     def _save(self):
-        self.path.write_text(json.dumps(self.data, indent=2))
+        self.backend.save_user(self.data)
 
     # ---------- DOB ----------
 
@@ -44,7 +38,7 @@ class UserStore:
         dob format: YYYY-MM-DD
         """
         self.data["date_of_birth"] = dob
-        self._save()
+        self.backend.set_date_of_birth(self.user_id, dob)
 
     def calculate_age(self, at_time: Optional[str] = None) -> Optional[int]:
         if not self.data["date_of_birth"]:
@@ -75,16 +69,16 @@ class UserStore:
         recorded_utc = self._now()
         age = self.calculate_age(recorded_utc)
 
-        self.data["voice_versions"].append({
+        version = {
             "version_id": f"v{len(self.data['voice_versions']) + 1}",
             "recorded_utc": recorded_utc,
             "age_at_recording": age,
             "audio_path": audio_path,
             "confidence": round(confidence, 3),
             "type": voice_type
-        })
-
-        self._save()
+        }
+        self.data["voice_versions"].append(version)
+        self.backend.append_version(self.user_id, version)
 
     # ---------- Read ----------
 
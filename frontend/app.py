@@ -2,7 +2,6 @@
 
 import sys
 import os
-import json
 import tempfile
 from pathlib import Path
 
@@ -13,7 +12,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-USERS_DIR = PROJECT_ROOT / "users"
+from scripts.user_registry import UserRegistry, list_users
 
 
 def run_app():
@@ -35,16 +34,14 @@ def run_app():
     # ==============================================================
     st.header("👤 User Dashboard")
 
-    user_files = list(USERS_DIR.glob("*.json"))
-    if not user_files:
+    user_ids = list_users()
+    if not user_ids:
         st.error("No users found. Please create a user first.")
         st.stop()
 
-    user_ids = [f.stem for f in user_files]
     selected_user = st.selectbox("Select User", user_ids)
 
-    user_path = USERS_DIR / f"{selected_user}.json"
-    user = json.loads(user_path.read_text())
+    user = UserRegistry(selected_user).data
 
     col1, col2 = st.columns(2)
     with col1:
@@ -116,6 +113,16 @@ def run_app():
 
     target_age = st.slider("Select target age", 5, 90, 60)
 
+    # O(1) table read per slider position (no selection / aging work)
+    from scripts.age_trajectory import AgeTrajectory, refresh_trajectory
+    trajectory = AgeTrajectory(selected_user)
+    row = trajectory.lookup(target_age)
+    if row is None and user.get("voice_versions"):
+        refresh_trajectory(selected_user, user["voice_versions"])
+        row = trajectory.lookup(target_age)
+    if row is not None:
+        st.caption(f"Voice at {target_age}: {row['label']} · confidence {row['confidence']:.2f}")
+
     text_to_speak = st.text_area(
         "Text to speak",
         value="Hello, this is how my voice may sound in the future.",
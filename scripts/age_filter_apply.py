@@ -14,33 +14,22 @@ from pathlib import Path
 
 SR = 24000
 N_MELS = 80
+N_FFT = 2048        # librosa melspectrogram defaults
+HOP_LENGTH = 512
+FMIN = 80
+FMAX = 7600
 
 FILTER_DIR = Path("learning/age_filters")
 
+MODES = ("stft", "griffinlim")
 
-def apply_age_filter(
-    wav_path: str,
-    out_path: str,
-    target_age: int,
-):
-    """
-    Apply mel-spectral age correction.
-    """
 
-    # -------- Load audio --------
-    y, sr = librosa.load(wav_path, sr=SR)
+# ------------------ FILTER ------------------
 
-    # -------- Mel spectrogram --------
-    mel = librosa.feature.melspectrogram(
-        y=y,
-        sr=sr,
-        n_mels=N_MELS,
-        fmin=80,
-        fmax=7600,
-    )
-    log_mel = np.log(mel + 1e-6)
-
-    # -------- Load profiles --------
+def age_log_mel_delta(target_age: int) -> np.ndarray:
+    """
+    Strength-scaled log-mel delta (N_MELS,) for `target_age`.
+    """
     adult_profile = np.load(FILTER_DIR / "adult_profile.npy")
 
     if target_age < 13:
@@ -54,19 +43,86 @@ def apply_age_filter(
         delta = np.zeros_like(adult_profile)
         strength = 0.0
 
+    return strength * delta
+
+
+def mel_delta_to_stft_gain(log_delta: np.ndarray, sr: int = SR, n_fft: int = N_FFT) -> np.ndarray:
+    """
+    Interpolates a log-power mel delta onto the linear STFT bins and
+    returns the per-bin AMPLITUDE gain (n_fft // 2 + 1,).
+    Bins outside [FMIN, FMAX] hold the edge band's value.
+    """
+    mel_centers = librosa.mel_frequencies(n_mels=len(log_delta) + 2, fmin=FMIN, fmax=FMAX)[1:-1]
+    bin_freqs = librosa.fft_frequencies(sr=sr, n_fft=n_fft)
+    log_gain = np.interp(bin_freqs, mel_centers, log_delta)
+    return np.exp(0.5 * log_gain)   # power delta -> amplitude gain
+
+
+def _filter_griffinlim(y: np.ndarray, sr: int, log_delta: np.ndarray) -> np.ndarray:
+    # -------- Mel spectrogram --------
+    mel = librosa.feature.melspectrogram(
+        y=y,
+        sr=sr,
+        n_mels=N_MELS,
+        fmin=FMIN,
+        fmax=FMAX,
+    )
+    log_mel = np.log(mel + 1e-6)
+
     # -------- Apply filter (SAFE) --------
-    adjusted = log_mel + strength * delta[:, None]
+    adjusted = log_mel + log_delta[:, None]
 
     # -------- Reconstruct audio --------
     mel_out = np.exp(adjusted)
-    y_out = librosa.feature.inverse.mel_to_audio(
+    return librosa.feature.inverse.mel_to_audio(
         mel_out,
         sr=sr,
         n_iter=32,
-        hop_length=512,
+        hop_length=HOP_LENGTH,
     )
 
+
+def _filter_stft(y: np.ndarray, sr: int, log_delta: np.ndarray) -> np.ndarray:
+    # -------- Gain on the complex STFT (phase untouched) --------
+    spec = librosa.stft(y, n_fft=N_FFT, hop_length=HOP_LENGTH)
+    spec *= mel_delta_to_stft_gain(log_delta, sr=sr, n_fft=N_FFT)[:, None]
+
+    # -------- Single inverse transform --------
+    return librosa.istft(spec, hop_length=HOP_LENGTH, length=len(y))
+
+
+def filter_audio(y: np.ndarray, sr: int, target_age: int, mode: str = "stft") -> np.ndarray:
+    """
+    In-memory age filter. `mode`:
+      stft        per-bin gain on the STFT + one ISTFT (fast, keeps phase)
+      griffinlim  original mel -> Griffin-Lim (32 iterations) path
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown age filter mode: {mode}")
+
+    log_delta = age_log_mel_delta(target_age)
+    if mode == "stft":
+        y_out = _filter_stft(y, sr, log_delta)
+    else:
+        y_out = _filter_griffinlim(y, sr, log_delta)
+
     # -------- Loudness normalize --------
-    y_out = librosa.util.normalize(y_out)
+    return librosa.util.normalize(y_out)
+
+
+def apply_age_filter(
+    wav_path: str,
+    out_path: str,
+    target_age: int,
+    mode: str = "stft",
+):
+    """
+    Apply mel-spectral age correction.
+    """
+
+    # -------- Load audio --------
+    y, sr = librosa.load(wav_path, sr=SR)
+
+    y_out = filter_audio(y, sr, target_age, mode=mode)
 
-    sf.write(out_path, y_out, sr)
\ No newline at end of file
+    sf.write(out_path, y_out, sr)
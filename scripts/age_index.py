@@ -0,0 +1,125 @@
+# scripts/age_index.py
+
+import bisect
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+INDEX_SLOTS = 256
+
+
+# ------------------ INDEX ------------------
+
+class AgeIndex:
+    """
+    Versions sorted by `age_at_recording` for O(log n) lookups.
+
+    Tie-breaking matches the linear scans it replaces: among versions
+    at the same distance from the target, the one listed first wins.
+    Versions without an age are ignored.
+    """
+
+    def __init__(self, versions: List[dict]):
+        entries = sorted(
+            (int(v["age_at_recording"]), i)
+            for i, v in enumerate(versions)
+            if v.get("age_at_recording") is not None
+        )
+        self.versions = versions
+        self.ages = [a for a, _ in entries]
+        self.order = [i for _, i in entries]
+
+    def __len__(self) -> int:
+        return len(self.ages)
+
+    def _first_at(self, age: int) -> int:
+        # lowest list position among versions recorded at `age`
+        return self.order[bisect.bisect_left(self.ages, age)]
+
+    def nearest(self, target_age: int) -> Tuple[Optional[dict], Optional[int]]:
+        """
+        (version, gap) closest to target_age, or (None, None).
+        """
+        if not self.ages:
+            return None, None
+
+        pos = bisect.bisect_left(self.ages, target_age)
+        candidates = []
+        if pos < len(self.ages):
+            candidates.append((self.ages[pos] - target_age, self._first_at(self.ages[pos])))
+        if pos > 0:
+            candidates.append((target_age - self.ages[pos - 1], self._first_at(self.ages[pos - 1])))
+
+        gap, i = min(candidates)
+        return self.versions[i], gap
+
+    def neighbours(self, target_age: int) -> Tuple[Optional[dict], Optional[dict]]:
+        """
+        Closest versions strictly below and strictly above target_age
+        (the interpolation bracket); either side may be None.
+        """
+        lo = bisect.bisect_left(self.ages, target_age)
+        hi = bisect.bisect_right(self.ages, target_age)
+        below = self.versions[self._first_at(self.ages[lo - 1])] if lo > 0 else None
+        above = self.versions[self._first_at(self.ages[hi])] if hi < len(self.ages) else None
+        return below, above
+
+    def lookup(self, target_age: int) -> Dict:
+        nearest, gap = self.nearest(target_age)
+        below, above = self.neighbours(target_age)
+        return {"nearest": nearest, "gap": gap, "below": below, "above": above}
+
+
+# ------------------ CACHES ------------------
+
+_LIST_CACHE = OrderedDict()    # id(list) -> (list, len, AgeIndex)
+_FILE_CACHE = {}               # (path, loader) -> ((mtime_ns, size), rows, AgeIndex)
+_CACHE_LOCK = threading.Lock()
+
+
+def age_index_for(versions: List[dict]) -> AgeIndex:
+    """
+    Index for an in-memory versions list. Keyed on the list object;
+    an append (length change) rebuilds it. The cache holds a reference
+    to the list, so its id cannot be recycled while cached.
+    """
+    key = id(versions)
+    with _CACHE_LOCK:
+        entry = _LIST_CACHE.get(key)
+        if entry is not None and entry[0] is versions and entry[1] == len(versions):
+            _LIST_CACHE.move_to_end(key)
+            return entry[2]
+
+    index = AgeIndex(versions)
+    with _CACHE_LOCK:
+        _LIST_CACHE[key] = (versions, len(versions), index)
+        _LIST_CACHE.move_to_end(key)
+        while len(_LIST_CACHE) > INDEX_SLOTS:
+            _LIST_CACHE.popitem(last=False)
+    return index
+
+
+def age_index_for_file(path, loader: Callable[[Path], List[dict]]) -> Tuple[List[dict], AgeIndex]:
+    """
+    (rows, index) for a versions file parsed by `loader`; re-parsed
+    only when the file's mtime or size changes.
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return [], AgeIndex([])
+
+    key = (str(path.resolve()), loader)
+    with _CACHE_LOCK:
+        entry = _FILE_CACHE.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1], entry[2]
+
+    rows = loader(path)
+    index = AgeIndex(rows)
+    with _CACHE_LOCK:
+        _FILE_CACHE[key] = (stamp, rows, index)
+    return rows, index
@@ -1,9 +1,97 @@
 # scripts/age_micro_dsp.py
 
+from typing import Iterable, Iterator, Optional
+
 import numpy as np
-import librosa
 import soundfile as sf
 
+BLOCK_SIZE = 65536      # frames per block; bounds memory for any clip length
+
+
+class MicroInstability:
+    """
+    Streaming jitter / shimmer / tremor processor.
+
+    Blocks may be any length; the tremor oscillator's phase is carried
+    across calls and all noise is drawn into one reusable buffer, so
+    memory stays at O(block_size) however long the stream is.
+    """
+
+    def __init__(
+        self,
+        sr: int,
+        jitter: float = 0.0,
+        shimmer: float = 0.0,
+        tremor_rate: float = 0.0,
+        seed: Optional[int] = None,
+        block_size: int = BLOCK_SIZE,
+    ):
+        self.sr = sr
+        self.jitter = jitter
+        self.shimmer = shimmer
+        self.tremor_rate = tremor_rate
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        self._noise = np.empty(block_size, dtype=np.float32)
+        self._phase = 0.0
+
+    def _process_slice(self, y: np.ndarray):
+        n = len(y)
+        noise = self._noise[:n]
+
+        # ---------------- Pitch Jitter ----------------
+        if self.jitter > 0:
+            self._rng.standard_normal(out=noise, dtype=np.float32)
+            y += noise * (self.jitter * 0.003)
+
+        # ---------------- Shimmer ----------------
+        if self.shimmer > 0:
+            self._rng.standard_normal(out=noise, dtype=np.float32)
+            y *= 1.0 + noise * self.shimmer
+
+        # ---------------- Tremor ----------------
+        if self.tremor_rate > 0:
+            step = 2 * np.pi * self.tremor_rate / self.sr
+            phase = self._phase + step * np.arange(n, dtype=np.float64)
+            y += (0.003 * np.sin(phase)).astype(np.float32)
+            self._phase = float((self._phase + step * n) % (2 * np.pi))
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Returns a new float32 mono block (input left untouched).
+        """
+        y = np.array(block, dtype=np.float32)
+        if y.ndim > 1:
+            y = y.mean(axis=1)
+
+        for start in range(0, len(y), self.block_size):
+            self._process_slice(y[start:start + self.block_size])
+        return y
+
+
+def micro_instability_blocks(
+    blocks: Iterable[np.ndarray],
+    sr: int,
+    jitter: float = 0.0,
+    shimmer: float = 0.0,
+    tremor_rate: float = 0.0,
+    seed: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Inline form for streaming output (e.g. stream_voice()["chunks"]).
+
+    The global peak is unknown while streaming, so instead of peak
+    normalization a running-peak limiter only ever attenuates: chunks
+    are divided by max(peak so far, 1.0).
+    """
+    proc = MicroInstability(sr, jitter, shimmer, tremor_rate, seed)
+    peak = 1.0
+    for block in blocks:
+        y = proc.process(block)
+        if len(y):
+            peak = max(peak, float(np.max(np.abs(y))))
+        yield y / peak
+
 
 def apply_micro_instability(
     wav_path: str,
@@ -11,33 +99,39 @@ def apply_micro_instability(
     jitter: float = 0.0,
     shimmer: float = 0.0,
     tremor_rate: float = 0.0,
+    seed: Optional[int] = None,
+    block_size: int = BLOCK_SIZE,
 ):
     """
     Adds human-like micro-instability:
     - jitter: random pitch noise
     - shimmer: amplitude fluctuation
     - tremor_rate: slow sinusoidal pitch wobble
-    """
 
-    y, sr = librosa.load(wav_path, sr=None)
+    Block-streamed in two passes with the same seed: the first finds
+    the output peak, the second regenerates identical blocks, scales
+    them and writes them out incrementally.
+    """
 
-    # ---------------- Pitch Jitter ----------------
-    if jitter > 0:
-        noise = np.random.normal(0, jitter, size=len(y))
-        y = y + noise * 0.003
+    if seed is None:
+        seed = int(np.random.randint(0, 2 ** 31 - 1))
 
-    # ---------------- Shimmer ----------------
-    if shimmer > 0:
-        amp = 1.0 + np.random.normal(0, shimmer, size=len(y))
-        y = y * amp
+    def _blocks(f):
+        f.seek(0)
+        proc = MicroInstability(f.samplerate, jitter, shimmer, tremor_rate, seed, block_size)
+        for block in f.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            yield proc.process(block)
 
-    # ---------------- Tremor ----------------
-    if tremor_rate > 0:
-        t = np.linspace(0, len(y) / sr, num=len(y))
-        tremor = 0.003 * np.sin(2 * np.pi * tremor_rate * t)
-        y = y + tremor
+    with sf.SoundFile(str(wav_path)) as f:
+        sr = f.samplerate
 
-    # Normalize
-    y = y / np.max(np.abs(y) + 1e-6)
+        peak = 0.0
+        for y in _blocks(f):
+            if len(y):
+                peak = max(peak, float(np.max(np.abs(y))))
 
-    sf.write(out_path, y, sr)
\ No newline at end of file
+        # Normalize
+        scale = 1.0 / (peak + 1e-6)
+        with sf.SoundFile(str(out_path), "w", samplerate=sr, channels=1) as out:
+            for y in _blocks(f):
+                out.write(y * scale)
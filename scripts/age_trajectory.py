@@ -0,0 +1,382 @@
+# scripts/age_trajectory.py
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from scripts.age_index import AgeIndex
+from scripts.age_selector import classify_age_relation
+from scripts.embedding_store import load_embedding_ref
+
+# ------------------ PATH ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TRAJ_DIR = PROJECT_ROOT / "versions" / "trajectories"
+
+# ------------------ CONSTANTS ------------------
+
+AGE_MIN = 5            # frontend slider range
+AGE_MAX = 90
+RECORDED_GAP = 5       # same rule as smart_version_selector
+AGING_SPAN_YEARS = 40.0
+STORE_DTYPE = "float16"
+
+RECORDED = "RECORDED"
+INTERPOLATED = "INTERPOLATED"
+PREDICTED = "PREDICTED"
+NONE = "NONE"
+
+# user_id -> (meta mtime_ns, meta, matrix)
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+# ------------------ EMBEDDING MATH ------------------
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    v = np.asarray(v, dtype="float32").reshape(-1)
+    n = np.linalg.norm(v)
+    return v / n if n > 0 else v
+
+
+def slerp(a: np.ndarray, b: np.ndarray, t: float) -> np.ndarray:
+    """
+    Spherical interpolation between two unit embeddings.
+    """
+    a, b = _unit(a), _unit(b)
+    dot = float(np.clip(np.dot(a, b), -1.0, 1.0))
+    theta = np.arccos(dot)
+    if theta < 1e-4:
+        return _unit((1.0 - t) * a + t * b)
+    s = np.sin(theta)
+    return _unit((np.sin((1.0 - t) * theta) / s) * a + (np.sin(t * theta) / s) * b)
+
+
+def aged_embedding(base_emb: np.ndarray, base_age, target_age: int, age_deltas: dict):
+    """
+    Phase-2 aging of one embedding with the global delta table.
+    Returns (embedding, alpha, relation); KeyError if the needed
+    delta is missing from the table.
+    """
+    relation = classify_age_relation(base_age, target_age)
+
+    delta_key = (
+        "children_to_adult"
+        if relation == "future"
+        else "adult_to_children"
+    )
+    if delta_key not in age_deltas:
+        raise KeyError(delta_key)
+
+    years = abs((base_age or target_age) - target_age)
+    alpha = min(years / AGING_SPAN_YEARS, 1.0)
+
+    emb = _unit(base_emb) + alpha * age_deltas[delta_key]
+    return _unit(emb), alpha, relation
+
+
+# ------------------ ANCHORS ------------------
+
+def _anchors(versions: list) -> List[dict]:
+    """
+    Versions usable as trajectory anchors: known age + embedding.
+    First version per age wins (list order), like the selector's
+    tie-breaking.
+    """
+    seen = set()
+    out = []
+    for v in versions:
+        age = v.get("age_at_recording")
+        if age is None or not v.get("embedding_path") or age in seen:
+            continue
+        seen.add(age)
+        out.append({
+            "version_id": str(v["version_id"]),
+            "age": int(age),
+            "age_at_recording": int(age),
+            "confidence": float(v.get("confidence") or 0.0),
+            "embedding_path": v["embedding_path"],
+        })
+    return out
+
+
+def anchors_checksum(anchors: List[dict]) -> str:
+    key = "|".join(f"{a['version_id']}:{a['age']}:{a['embedding_path']}" for a in anchors)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _plan_row(age: int, index: AgeIndex, pos: dict) -> Tuple[str, int, Optional[int], float]:
+    """
+    (label, anchor index, second anchor index, t) for one age;
+    `pos` maps version_id -> anchor index.
+    """
+    nearest, gap = index.nearest(age)
+    if gap <= RECORDED_GAP:
+        return RECORDED, pos[nearest["version_id"]], None, 0.0
+
+    below, above = index.neighbours(age)
+    if below is not None and above is not None:
+        t = (age - below["age"]) / (above["age"] - below["age"])
+        return INTERPOLATED, pos[below["version_id"]], pos[above["version_id"]], float(t)
+
+    return PREDICTED, pos[nearest["version_id"]], None, 0.0
+
+
+def _confidence(base_conf: float, years: float) -> float:
+    return round(base_conf * (1.0 - 0.5 * min(years / AGING_SPAN_YEARS, 1.0)), 3)
+
+
+# ------------------ TABLE ------------------
+
+class AgeTrajectory:
+    """
+    Per-user (ages x D) table of playback embeddings, one row per age
+    in [AGE_MIN, AGE_MAX]:
+
+      RECORDED      a real version within RECORDED_GAP years
+      INTERPOLATED  SLERP between the neighbouring recorded ages
+      PREDICTED     delta-aged from the nearest end of the recorded span
+
+    versions/trajectories/<id>.traj.npy   float16 matrix (memory-mapped)
+    versions/trajectories/<id>.traj.meta  labels, confidences, source
+                                          versions, anchor checksum
+    """
+
+    def __init__(self, user_id: str, traj_dir: Path = TRAJ_DIR):
+        self.user_id = user_id
+        self.data_path = Path(traj_dir) / f"{user_id}.traj.npy"
+        self.meta_path = Path(traj_dir) / f"{user_id}.traj.meta"
+
+    # ------------------ DISK ------------------
+
+    def _read(self) -> Tuple[Optional[dict], Optional[np.ndarray]]:
+        try:
+            mtime = self.meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None, None
+
+        with _CACHE_LOCK:
+            cached = _CACHE.get(self.user_id)
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            matrix = np.load(self.data_path, mmap_mode="r")
+        except Exception:
+            return None, None
+        if matrix.shape != (len(meta["labels"]), meta["dim"]):
+            return None, None   # caught between the two renames
+
+        with _CACHE_LOCK:
+            _CACHE[self.user_id] = (mtime, meta, matrix)
+        return meta, matrix
+
+    def _write(self, meta: dict, matrix: np.ndarray):
+        self.data_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_data = self.data_path.with_suffix(".tmp.npy")
+        np.save(tmp_data, matrix.astype(STORE_DTYPE))
+        os.replace(tmp_data, self.data_path)
+
+        tmp_meta = self.meta_path.with_suffix(".meta.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self.meta_path)
+
+        with _CACHE_LOCK:
+            _CACHE.pop(self.user_id, None)
+
+    # ------------------ BUILD ------------------
+
+    def _fill_rows(self, ages, anchors, embs, matrix, meta, age_deltas):
+        index = AgeIndex(anchors)
+        pos = {a["version_id"]: i for i, a in enumerate(anchors)}
+        for age in ages:
+            r = age - AGE_MIN
+            label, i, j, t = _plan_row(age, index, pos)
+            a = anchors[i]
+
+            if label == RECORDED:
+                emb, conf, alpha = embs[i], a["confidence"], 0.0
+            elif label == INTERPOLATED:
+                b = anchors[j]
+                emb = slerp(embs[i], embs[j], t)
+                base_conf = (1.0 - t) * a["confidence"] + t * b["confidence"]
+                conf = _confidence(base_conf, min(age - a["age"], b["age"] - age))
+                alpha = t
+                if t > 0.5:
+                    a = b   # nearer recording serves as the reference audio
+            else:
+                try:
+                    emb, alpha, _ = aged_embedding(embs[i], a["age"], age, age_deltas or {})
+                    conf = _confidence(a["confidence"], abs(age - a["age"]))
+                except KeyError:
+                    label, emb, conf, alpha = NONE, np.zeros_like(embs[i]), 0.0, 0.0
+
+            matrix[r] = emb
+            meta["labels"][r] = label
+            meta["confidences"][r] = round(float(conf), 3)
+            meta["version_ids"][r] = a["version_id"]
+            meta["alphas"][r] = round(float(alpha), 2)
+
+    def build(self, versions: list, age_deltas: Optional[dict], delta_stamp=None) -> Optional[dict]:
+        """
+        Full rebuild from the user's versions.
+        """
+        anchors = _anchors(versions)
+        embs = [load_embedding_ref(a["embedding_path"]) for a in anchors]
+        anchors = [a for a, e in zip(anchors, embs) if e is not None]
+        embs = [_unit(e) for e in embs if e is not None]
+        if not anchors:
+            return None
+
+        n = AGE_MAX - AGE_MIN + 1
+        matrix = np.zeros((n, embs[0].shape[0]), dtype="float32")
+        meta = {
+            "age_min": AGE_MIN,
+            "age_max": AGE_MAX,
+            "dim": int(matrix.shape[1]),
+            "labels": [NONE] * n,
+            "confidences": [0.0] * n,
+            "version_ids": [None] * n,
+            "alphas": [0.0] * n,
+            "anchors": [{"version_id": a["version_id"], "age": a["age"]} for a in anchors],
+            "checksum": anchors_checksum(anchors),
+            "delta_stamp": list(delta_stamp) if delta_stamp else None,
+        }
+
+        self._fill_rows(range(AGE_MIN, AGE_MAX + 1), anchors, embs, matrix, meta, age_deltas)
+        self._write(meta, matrix)
+        return meta
+
+    def update(self, versions: list, age_deltas: Optional[dict], delta_stamp=None) -> Optional[dict]:
+        """
+        Brings the table in line with `versions`. When the only change
+        is new anchors, just the rows between each new anchor's old
+        neighbours are recomputed; anything else is a full rebuild.
+        """
+        anchors = _anchors(versions)
+        meta, matrix = self._read()
+        stamp = list(delta_stamp) if delta_stamp else None
+
+        if self._current(meta, anchors, stamp):
+            return meta
+
+        old = {(a["version_id"], a["age"]) for a in meta["anchors"]} if meta else set()
+        new = [a for a in anchors if (a["version_id"], a["age"]) not in old]
+        old_ages = sorted(a["age"] for a in meta["anchors"]) if meta else []
+
+        if meta is None or meta["delta_stamp"] != stamp or len(anchors) - len(new) != len(old):
+            return self.build(versions, age_deltas, delta_stamp)
+
+        embs = [load_embedding_ref(a["embedding_path"]) for a in anchors]
+        if any(e is None for e in embs):
+            return self.build(versions, age_deltas, delta_stamp)
+        embs = [_unit(e) for e in embs]
+        if embs[0].shape[0] != meta["dim"]:
+            return self.build(versions, age_deltas, delta_stamp)
+
+        dirty = set()
+        for a in new:
+            lo = max((x for x in old_ages if x < a["age"]), default=AGE_MIN)
+            hi = min((x for x in old_ages if x > a["age"]), default=AGE_MAX)
+            dirty.update(range(max(lo, AGE_MIN), min(hi, AGE_MAX) + 1))
+
+        meta = dict(meta)
+        for k in ("labels", "confidences", "version_ids", "alphas"):
+            meta[k] = list(meta[k])
+        meta["anchors"] = [{"version_id": a["version_id"], "age": a["age"]} for a in anchors]
+        meta["checksum"] = anchors_checksum(anchors)
+
+        matrix = np.array(matrix, dtype="float32")
+        self._fill_rows(sorted(dirty), anchors, embs, matrix, meta, age_deltas)
+        self._write(meta, matrix)
+        return meta
+
+    # ------------------ LOOKUP ------------------
+
+    @staticmethod
+    def _current(meta: Optional[dict], anchors: list, stamp) -> bool:
+        return (
+            meta is not None
+            and meta["checksum"] == anchors_checksum(anchors)
+            and meta["delta_stamp"] == stamp
+        )
+
+    def is_current(self, versions: list, delta_stamp=None) -> bool:
+        """
+        Read-only check that the stored table matches `versions` and the
+        delta table; playback uses it instead of update().
+        """
+        meta, _ = self._read()
+        stamp = list(delta_stamp) if delta_stamp else None
+        return self._current(meta, _anchors(versions), stamp)
+
+    def lookup(self, age: int) -> Optional[dict]:
+        """
+        O(1) row read: label, confidence, source version and the
+        (read-only, float32) embedding for `age`.
+        """
+        meta, matrix = self._read()
+        if meta is None or not (meta["age_min"] <= age <= meta["age_max"]):
+            return None
+
+        r = age - meta["age_min"]
+        emb = np.asarray(matrix[r], dtype="float32")
+        emb.setflags(write=False)
+        return {
+            "age": age,
+            "label": meta["labels"][r],
+            "confidence": meta["confidences"][r],
+            "version_id": meta["version_ids"][r],
+            "alpha": meta["alphas"][r],
+            "embedding": emb,
+        }
+
+    def summary(self) -> Optional[dict]:
+        """
+        Labels + confidences for every age (frontend chart).
+        """
+        meta, _ = self._read()
+        if meta is None:
+            return None
+        return {
+            "ages": list(range(meta["age_min"], meta["age_max"] + 1)),
+            "labels": meta["labels"],
+            "confidences": meta["confidences"],
+        }
+
+
+def refresh_trajectory(user_id: str, versions: list) -> Optional[dict]:
+    """
+    Incremental update with the current delta table (hook used when
+    a version is created).
+    """
+    from scripts.hybrid_playback_decider import load_age_deltas
+
+    age_deltas, delta_stamp = load_age_deltas()
+    return AgeTrajectory(user_id).update(versions, age_deltas, delta_stamp)
+
+
+def refresh_all_trajectories() -> int:
+    """
+    Brings every user's table up to date (run after the delta table
+    is rebuilt); returns how many users have a table.
+    """
+    from scripts.user_registry import UserRegistry, list_users
+
+    refreshed = 0
+    for user_id in list_users():
+        try:
+            if refresh_trajectory(user_id, UserRegistry(user_id).get_versions()) is not None:
+                refreshed += 1
+        except Exception as e:
+            print(f"⚠️ Trajectory refresh failed for {user_id}: {e}")
+    return refreshed
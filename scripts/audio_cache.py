@@ -1,26 +1,271 @@
 # scripts/audio_cache.py
 
 import hashlib
+import os
+import sqlite3
+import threading
+import time
 from pathlib import Path
-import shutil
+from typing import Optional
+
+import numpy as np
 import soundfile as sf
-from TTS.api import TTS
+
+from scripts.config_loader import CONFIG
+from scripts.single_flight import get_single_flight
+from scripts.synthesis_engine import MODEL_NAME, SAMPLE_RATE, get_synthesis_engine
 
 # ------------------ CONSTANTS ------------------
 
 CACHE_DIR = Path("cache/audio")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
-SAMPLE_RATE = 24000
+_CACHE_CFG = CONFIG.get("audio_cache", {})
+MAX_BYTES = int(_CACHE_CFG.get("max_bytes", 2 * 1024 ** 3))
+EVICTION_POLICY = _CACHE_CFG.get("policy", "lru")    # lru | lfu
+# entries looked up / written this recently are never evicted, so a
+# reader that just got a path from lookup() can still open the file
+EVICT_GRACE_SEC = float(_CACHE_CFG.get("evict_grace_sec", 300))
+
+
+def _model_version() -> str:
+    try:
+        from importlib.metadata import version
+        return f"{MODEL_NAME}@{version('TTS')}"
+    except Exception:
+        return MODEL_NAME
+
+
+MODEL_VERSION = _model_version()
 
 
 # ------------------ CACHE KEY ------------------
 
-def make_cache_key(text: str, speaker_wav: str) -> str:
-    speaker_wav = str(Path(speaker_wav).resolve())
-    key = f"{MODEL_NAME}|{text}|{speaker_wav}"
-    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def embedding_hash(speaker_embedding) -> str:
+    if speaker_embedding is None:
+        return "none"
+    # rounded so float noise from re-normalization doesn't split entries
+    emb = np.round(np.asarray(speaker_embedding, dtype=np.float32).reshape(-1), 5)
+    return _sha256(emb.tobytes())
+
+
+def make_cache_key(text: str, speaker_wav: str, speaker_embedding=None) -> str:
+    """
+    Content-addressed key: text, reference audio BYTES, aged speaker
+    embedding and model version. Byte-identical references share
+    entries; different target ages (different embeddings) do not.
+    """
+    from scripts.speaker_latents import audio_content_hash
+
+    parts = [
+        _sha256(text.encode("utf-8")),
+        audio_content_hash(speaker_wav),
+        embedding_hash(speaker_embedding),
+        MODEL_VERSION,
+    ]
+    return _sha256("|".join(parts).encode("utf-8"))
+
+
+def cache_path_for(text: str, speaker_wav: str, speaker_embedding=None) -> Path:
+    return CACHE_DIR / f"{make_cache_key(text, speaker_wav, speaker_embedding)}.wav"
+
+
+# ------------------ CACHE INDEX ------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key          TEXT PRIMARY KEY,
+    bytes        INTEGER NOT NULL,
+    created      REAL NOT NULL,
+    last_access  REAL NOT NULL,
+    hits         INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS idx_entries_hits ON entries (hits, last_access);
+
+CREATE TABLE IF NOT EXISTS counters (
+    name   TEXT PRIMARY KEY,
+    value  INTEGER NOT NULL
+);
+"""
+
+
+class AudioCacheIndex:
+    """
+    SQLite (WAL) index over cache/audio/*.wav.
+
+    Tracks size, recency and hit count per entry, keeps the directory
+    under a byte budget with LRU or LFU eviction, and counts
+    hits / misses / evictions. WAL lets many readers look up entries
+    while one writer inserts.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = CACHE_DIR,
+        max_bytes: int = MAX_BYTES,
+        policy: str = EVICTION_POLICY,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.db_path = self.cache_dir / "index.db"
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def _bump(self, conn, name: str, n: int = 1):
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, n),
+        )
+
+    # ------------------ READ ------------------
+
+    def lookup(self, key: str, record: bool = True) -> Optional[Path]:
+        """
+        Returns the cached file (and records the hit) or None (miss).
+        `record=False` is for re-checks that follow a counted miss: the
+        request was already counted once, so neither a hit nor a miss
+        is recorded again.
+        """
+        path = self.path_for(key)
+        now = time.time()
+
+        with self._conn() as conn:
+            row = conn.execute("SELECT key FROM entries WHERE key = ?", (key,)).fetchone()
+
+            if path.exists():
+                if row is None:
+                    # file written by an older build / another process: adopt it
+                    conn.execute(
+                        "INSERT OR IGNORE INTO entries (key, bytes, created, last_access, hits) "
+                        "VALUES (?, ?, ?, ?, 0)",
+                        (key, path.stat().st_size, now, now),
+                    )
+                conn.execute(
+                    "UPDATE entries SET last_access = ?, hits = hits + ? WHERE key = ?",
+                    (now, int(record), key),
+                )
+                if record:
+                    self._bump(conn, "hits")
+                return path
+
+            if row is not None:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            if record:
+                self._bump(conn, "misses")
+            return None
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        n, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": n,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+    # ------------------ WRITE ------------------
+
+    def add(self, key: str):
+        """
+        Registers a freshly written cache file, then enforces the budget.
+        """
+        path = self.path_for(key)
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, bytes, created, last_access, hits) "
+                "VALUES (?, ?, ?, ?, 0)",
+                (key, path.stat().st_size, now, now),
+            )
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Drops entries until the budget is met, skipping any accessed in
+        the last EVICT_GRACE_SEC (the cache may briefly run over budget).
+        """
+        order = "hits ASC, last_access ASC" if self.policy == "lfu" else "last_access ASC"
+        cutoff = time.time() - EVICT_GRACE_SEC
+
+        with self._conn() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+
+            victims = []
+            for key, size in conn.execute(
+                f"SELECT key, bytes FROM entries WHERE last_access < ? ORDER BY {order}",
+                (cutoff,),
+            ):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+
+            conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in victims])
+            self._bump(conn, "evictions", len(victims))
+
+        for key in victims:
+            try:
+                os.remove(self.path_for(key))
+            except FileNotFoundError:
+                pass
+        return len(victims)
+
+
+_INDEX: Optional[AudioCacheIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_cache_index() -> AudioCacheIndex:
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = AudioCacheIndex()
+    return _INDEX
+
+
+def write_cache_file(key: str, wav) -> Path:
+    """
+    Atomic write of a rendered waveform into the cache + index.
+    """
+    index = get_cache_index()
+    cached_file = index.path_for(key)
+    tmp = cached_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp.wav")
+    sf.write(tmp, wav, SAMPLE_RATE)
+    os.replace(tmp, cached_file)
+    index.add(key)
+    get_single_flight().maybe_sweep()   # per-key lock files don't pile up
+    return cached_file
 
 
 # ------------------ MAIN API ------------------
@@ -28,31 +273,36 @@ def make_cache_key(text: str, speaker_wav: str) -> str:
 def get_cached_audio(
     text: str,
     speaker_wav: str,
-    speaker_embedding=None,   # kept for future use
+    speaker_embedding=None,
 ) -> Path:
     """
     Unified audio cache + synthesis entry.
     Returns path to cached WAV.
     """
 
-    cache_key = make_cache_key(text, speaker_wav)
-    cached_file = CACHE_DIR / f"{cache_key}.wav"
+    cache_key = make_cache_key(text, speaker_wav, speaker_embedding)
 
-    if cached_file.exists():
+    cached_file = get_cache_index().lookup(cache_key)
+    if cached_file is not None:
         print("⚡ Cache hit — serving cached audio")
         return cached_file
 
     print("🔊 Cache miss — synthesizing")
 
-    tts = TTS(model_name=MODEL_NAME)
+    def _render() -> Path:
+        # resident engine: model stays loaded between misses
+        wav = get_synthesis_engine().synthesize(
+            text=text,
+            speaker_wav=speaker_wav,
+        )
+        path = write_cache_file(cache_key, wav)
+        print("🧠 Audio cached")
+        return path
 
-    wav = tts.tts(
-        text=text,
-        speaker_wav=speaker_wav,
-        language="en"
+    # identical concurrent requests (threads or worker processes)
+    # wait for the first render instead of running XTTS again
+    return get_single_flight().do(
+        cache_key,
+        _render,
+        recheck=lambda: get_cache_index().lookup(cache_key, record=False),
     )
-
-    sf.write(cached_file, wav, SAMPLE_RATE)
-    print("🧠 Audio cached")
-
-    return cached_file
\ No newline at end of file
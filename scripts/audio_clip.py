@@ -0,0 +1,108 @@
+# scripts/audio_clip.py
+
+from math import gcd
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import soundfile as sf
+
+TARGET_SR = 16000
+
+
+def resample(samples: np.ndarray, orig_sr: int, target_sr: int = TARGET_SR) -> np.ndarray:
+    """
+    Polyphase resampling (exact rational ratio, no FFT over the whole clip).
+    """
+    if orig_sr == target_sr:
+        return samples.astype(np.float32, copy=False)
+
+    from scipy.signal import resample_poly
+
+    g = gcd(int(orig_sr), int(target_sr))
+    out = resample_poly(samples, int(target_sr) // g, int(orig_sr) // g)
+    return out.astype(np.float32, copy=False)
+
+
+class AudioClip:
+    """
+    One recording decoded once into a mono float32 16 kHz buffer.
+
+    Header metadata (sample rate, channels, subtype, duration) describes
+    the source file as uploaded, so the device fingerprint can be taken
+    without decoding it again. Every ingest stage accepts a clip in
+    place of a path.
+    """
+
+    def __init__(
+        self,
+        samples: np.ndarray,
+        sr: int = TARGET_SR,
+        path: Optional[str] = None,
+        orig_sr: Optional[int] = None,
+        channels: Optional[int] = None,
+        subtype: Optional[str] = None,
+        orig_duration: Optional[float] = None,
+    ):
+        self.samples = np.ascontiguousarray(samples, dtype=np.float32)
+        self.sr = sr
+        self.path = path
+        self.orig_sr = orig_sr
+        self.channels = channels
+        self.subtype = subtype
+        self.orig_duration = orig_duration
+
+    # ------------------ LOADERS ------------------
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        target_sr: int = TARGET_SR,
+        header_path: Optional[str] = None,
+    ) -> "AudioClip":
+        """
+        Decodes `path` once. `header_path` names the original upload when
+        `path` is an intermediate (e.g. a normalized WAV); only its header
+        is read.
+        """
+        with sf.SoundFile(str(path)) as f:
+            audio = f.read(dtype="float32", always_2d=True)
+            sr = f.samplerate
+            header = (f.samplerate, f.channels, f.subtype, len(f) / f.samplerate)
+
+        if header_path is not None and str(header_path) != str(path):
+            try:
+                info = sf.info(str(header_path))
+                header = (info.samplerate, info.channels, info.subtype, info.duration)
+            except Exception:
+                header = (None, None, None, None)
+
+        samples = resample(audio.mean(axis=1), sr, target_sr)
+
+        return cls(
+            samples,
+            sr=target_sr,
+            path=str(header_path or path),
+            orig_sr=header[0],
+            channels=header[1],
+            subtype=header[2],
+            orig_duration=header[3],
+        )
+
+    # ------------------ PROPERTIES ------------------
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sr
+
+    @property
+    def has_header(self) -> bool:
+        return self.orig_sr is not None
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def __repr__(self) -> str:
+        name = Path(self.path).name if self.path else "<memory>"
+        return f"AudioClip({name}, {self.duration:.2f}s @ {self.sr} Hz)"
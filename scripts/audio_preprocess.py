@@ -1,41 +1,119 @@
 import subprocess
 from pathlib import Path
-import uuid
-import os
 
+import numpy as np
+import soundfile as sf
 
-def normalize_audio(input_path: str) -> str:
-    """
-    Converts any audio to clean WAV (16kHz, mono, PCM).
-    Returns path to cleaned wav.
-    """
+from scripts.audio_clip import AudioClip, TARGET_SR, resample
+
+try:
+    import av  # optional: PyAV covers MP3/AAC/OPUS without a subprocess
+except Exception:
+    av = None
+
+
+# ------------------ DECODERS ------------------
+
+def _decode_soundfile(input_path: Path, target_sr: int) -> AudioClip:
+    with sf.SoundFile(str(input_path)) as f:
+        audio = f.read(dtype="float32", always_2d=True)
+        header = (f.samplerate, f.channels, f.subtype, len(f) / f.samplerate)
+
+    samples = resample(audio.mean(axis=1), header[0], target_sr)
+    return AudioClip(
+        samples, sr=target_sr, path=str(input_path),
+        orig_sr=header[0], channels=header[1],
+        subtype=header[2], orig_duration=header[3],
+    )
+
+
+def _decode_pyav(input_path: Path, target_sr: int) -> AudioClip:
+    with av.open(str(input_path)) as container:
+        stream = container.streams.audio[0]
+        ctx = stream.codec_context
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=target_sr)
+
+        chunks = []
+        for frame in container.decode(stream):
+            for out in resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        for out in resampler.resample(None):
+            chunks.append(out.to_ndarray().reshape(-1))
+
+        orig_sr = ctx.sample_rate
+        channels = ctx.channels
+        subtype = ctx.name.upper()
+
+    samples = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return AudioClip(
+        samples, sr=target_sr, path=str(input_path),
+        orig_sr=orig_sr, channels=channels, subtype=subtype,
+        orig_duration=len(samples) / target_sr,
+    )
 
-    input_path = Path(input_path)
-    out_path = input_path.parent / f"clean_{uuid.uuid4().hex}.wav"
 
+def _decode_ffmpeg(input_path: Path, target_sr: int) -> AudioClip:
+    """
+    Last resort for codecs neither libsndfile nor PyAV handle.
+    PCM is piped over stdout, so nothing is left on disk.
+    """
     cmd = [
-        "ffmpeg", "-y",
+        "ffmpeg", "-nostdin",
         "-err_detect", "ignore_err",
         "-i", str(input_path),
         "-ac", "1",
-        "-ar", "16000",
-        "-c:a", "pcm_s16le",
-        str(out_path)
+        "-ar", str(target_sr),
+        "-f", "f32le",
+        "-"
     ]
 
     result = subprocess.run(
         cmd,
-        stdout=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True
     )
 
-    # ✅ NEW: verify FFmpeg success
     if result.returncode != 0:
-        raise RuntimeError(f"FFmpeg failed: {result.stderr}")
+        raise RuntimeError(f"FFmpeg failed: {result.stderr.decode(errors='replace')}")
+
+    samples = np.frombuffer(result.stdout, dtype=np.float32)
+    # no source header available here; device fingerprint falls back
+    return AudioClip(samples.copy(), sr=target_sr, path=str(input_path))
+
 
-    # ✅ NEW: verify output exists
-    if not out_path.exists() or out_path.stat().st_size == 0:
-        raise RuntimeError("FFmpeg produced empty or missing output file")
+# ------------------ PUBLIC API ------------------
+
+def load_clip(input_path: str, target_sr: int = TARGET_SR) -> AudioClip:
+    """
+    Decodes any audio in-process into a mono float32 AudioClip.
+    soundfile -> PyAV -> ffmpeg (fallback only).
+    """
+    input_path = Path(input_path)
+    errors = []
 
-    return str(out_path)
\ No newline at end of file
+    decoders = [_decode_soundfile]
+    if av is not None:
+        decoders.append(_decode_pyav)
+    decoders.append(_decode_ffmpeg)
+
+    for decode in decoders:
+        try:
+            clip = decode(input_path, target_sr)
+        except Exception as e:
+            errors.append(f"{decode.__name__}: {e}")
+            continue
+
+        if len(clip) == 0:
+            errors.append(f"{decode.__name__}: empty output")
+            continue
+        return clip
+
+    raise RuntimeError("Audio decode failed | " + " | ".join(errors))
+
+
+def normalize_audio(input_path: str, target_sr: int = TARGET_SR) -> np.ndarray:
+    """
+    Converts any audio to clean mono float32 samples (16kHz).
+    Returns the array; no intermediate file is written.
+    """
+    return load_clip(input_path, target_sr).samples
@@ -4,10 +4,12 @@ import numpy as np
 import soundfile as sf
 import librosa
 
+from scripts.audio_clip import AudioClip
+
 TARGET_SR = 16000
 MIN_DURATION_SEC = 10.0
 MIN_SNR_DB = 15.0
-MIN_ACTIVE_RATIO = 0.6
+MIN_ACTIVE_RATIO = 0.6     # calibrated for the top_db=30 energy split below
 MIN_RMS_DB = -35.0
 
 
@@ -19,6 +21,9 @@ def _rms_db(signal: np.ndarray) -> float:
 
 
 def _active_speech_ratio(signal: np.ndarray, sr: int) -> float:
+    # Energy split, not WebRTC VAD: MIN_ACTIVE_RATIO has only been
+    # calibrated for this metric. Recalibrate on sample uploads before
+    # switching the gate to src.preprocess.vad_mask().
     intervals = librosa.effects.split(signal, top_db=30)
     active = sum(end - start for start, end in intervals)
     return active / len(signal)
@@ -44,8 +49,10 @@ def _snr_db(signal: np.ndarray, sr: int) -> float:
     return 10 * np.log10(speech / noise)
 
 
-def audio_quality_gate(audio_path: str, dev_mode: bool = False) -> dict:
+def audio_quality_gate(audio_path, dev_mode: bool = False) -> dict:
     """
+    Accepts a path or a decoded AudioClip (no re-read).
+
     Returns:
     {
         accepted: bool,
@@ -57,10 +64,13 @@ def audio_quality_gate(audio_path: str, dev_mode: bool = False) -> dict:
     }
     """
 
-    try:
-        audio, sr = sf.read(audio_path)
-    except Exception as e:
-        return {"accepted": False, "reason": f"Read error: {e}"}
+    if isinstance(audio_path, AudioClip):
+        audio, sr = audio_path.samples, audio_path.sr
+    else:
+        try:
+            audio, sr = sf.read(audio_path)
+        except Exception as e:
+            return {"accepted": False, "reason": f"Read error: {e}"}
 
     if audio.ndim > 1:
         audio = audio.mean(axis=1)
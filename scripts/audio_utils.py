@@ -1,11 +1,16 @@
 import soundfile as sf
 
+from scripts.audio_clip import AudioClip
 
-def get_audio_duration(audio_path: str) -> float:
+
+def get_audio_duration(audio_path) -> float:
     """
     Returns duration of audio file in seconds.
-    Supports WAV / FLAC / AIFF.
+    Supports WAV / FLAC / AIFF, or an already decoded AudioClip.
     """
+    if isinstance(audio_path, AudioClip):
+        return audio_path.duration
+
     try:
         with sf.SoundFile(audio_path) as f:
             return len(f) / f.samplerate
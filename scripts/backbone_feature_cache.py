@@ -0,0 +1,261 @@
+# scripts/backbone_feature_cache.py
+"""
+Frozen-backbone feature cache for Phase-3 training.
+
+The wav2vec2 backbone is frozen, so its pooled output for a file never
+changes. This runs it ONCE per audio file (length-sorted batches) and
+stores the mean-pooled 768-d vector; trainers then iterate over the
+cached vectors instead of re-running the backbone every epoch.
+
+features/<model>/index.json      key -> [shard, row]
+features/<model>/shard_00000.npy (rows x 768) float16, memory-mapped
+
+Keys hash the resolved path + mtime + size, so an edited file is
+re-featurized.
+
+wav2vec2-base (group-norm feature extractor) is not given an
+attention mask, so zero padding leaks into GroupNorm statistics and
+self-attention. For such backbones only clips of identical length are
+batched together, which keeps every cached vector equal to an
+unpadded single-clip forward.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import soundfile as sf
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ------------------ CONSTANTS ------------------
+
+MODEL_NAME = "facebook/wav2vec2-base-960h"
+CACHE_ROOT = PROJECT_ROOT / "features"
+FEATURE_DTYPE = "float16"
+SHARD_ROWS = 4096
+BATCH_SIZE = 8
+
+
+# bumped when cached vectors change meaning (v2: no mixed-length batches)
+KEY_VERSION = 2
+
+
+def path_key(path) -> str:
+    p = Path(path).resolve()
+    st = p.stat()
+    raw = f"{p}|{st.st_mtime_ns}|{st.st_size}|v{KEY_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _read_audio(path: str) -> np.ndarray:
+    # same decoding as UnifiedVoiceDataset.__getitem__
+    audio, _ = sf.read(path, dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return audio
+
+
+# ------------------ POOLING ------------------
+
+def masks_padding(backbone) -> bool:
+    """
+    True when the backbone takes an attention_mask (feat_extract_norm ==
+    "layer"), i.e. padded batches match unpadded forwards.
+    """
+    return getattr(backbone.config, "feat_extract_norm", None) == "layer"
+
+
+def masked_mean_pool(backbone, audio, lengths, attention_mask=None):
+    """
+    Mean of last_hidden_state over each clip's VALID frames only.
+    audio: (B, T) zero-padded, lengths: (B,) samples.
+
+    attention_mask is only forwarded to backbones trained with it (see
+    masks_padding()); for those a padded batch gives the same vectors as
+    one-clip-at-a-time forwards. wav2vec2-base expects plain zero
+    padding without a mask, so its GroupNorm and self-attention still
+    see the padding: the result is exact only for equal-length clips.
+    """
+    import torch
+
+    kwargs = {}
+    if attention_mask is not None and masks_padding(backbone):
+        kwargs["attention_mask"] = attention_mask
+
+    hidden = backbone(audio, return_dict=True, **kwargs).last_hidden_state  # (B, F, H)
+    frames = backbone._get_feat_extract_output_lengths(lengths)             # (B,)
+    frames = frames.clamp(min=1, max=hidden.shape[1]).to(hidden.device)
+
+    mask = torch.arange(hidden.shape[1], device=hidden.device)[None, :] < frames[:, None]
+    mask = mask.unsqueeze(-1).to(hidden.dtype)
+    return (hidden * mask).sum(dim=1) / frames[:, None].to(hidden.dtype)
+
+
+def _batches(paths: List[str], frames: Dict[str, int], batch_size: int, exact: bool) -> List[List[str]]:
+    """
+    Consecutive runs of length-sorted `paths`; with `exact`, a batch
+    never mixes clip lengths (no padding at all).
+    """
+    batches, batch = [], []
+    for p in paths:
+        if batch and (len(batch) >= batch_size or (exact and frames[p] != frames[batch[0]])):
+            batches.append(batch)
+            batch = []
+        batch.append(p)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# ------------------ CACHE ------------------
+
+class BackboneFeatureCache:
+    def __init__(self, model_name: str = MODEL_NAME, cache_root: Path = CACHE_ROOT):
+        self.model_name = model_name
+        self.dir = Path(cache_root) / model_name.replace("/", "__")
+        self.index_path = self.dir / "index.json"
+        self._index: Optional[Dict[str, list]] = None
+        self._shards: Dict[int, np.ndarray] = {}
+
+    # ------------------ INDEX ------------------
+
+    @property
+    def index(self) -> Dict[str, list]:
+        if self._index is None:
+            if self.index_path.exists():
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, self.index_path)
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.dir / f"shard_{shard:05d}.npy"
+
+    def _shard(self, shard: int) -> np.ndarray:
+        if shard not in self._shards:
+            self._shards[shard] = np.load(self._shard_path(shard), mmap_mode="r")
+        return self._shards[shard]
+
+    def _next_shard(self) -> int:
+        shards = [loc[0] for loc in self.index.values()]
+        return max(shards) + 1 if shards else 0
+
+    # ------------------ READ ------------------
+
+    def has(self, path) -> bool:
+        try:
+            return path_key(path) in self.index
+        except FileNotFoundError:
+            return False
+
+    def get(self, path) -> np.ndarray:
+        shard, row = self.index[path_key(path)]
+        return np.asarray(self._shard(shard)[row], dtype=np.float32)
+
+    def get_many(self, paths: Sequence[str]) -> np.ndarray:
+        return np.stack([self.get(p) for p in paths])
+
+    # ------------------ BUILD ------------------
+
+    def build(
+        self,
+        paths: Sequence[str],
+        batch_size: int = BATCH_SIZE,
+        device: str = "cpu",
+    ) -> int:
+        """
+        Featurizes every path not yet cached; returns how many were added.
+        """
+        import torch
+        from transformers import Wav2Vec2Model
+
+        todo = sorted({str(p) for p in paths if not self.has(p)})
+        if not todo:
+            return 0
+
+        # length-sorted batches keep padding (wasted backbone compute) small
+        frames = {p: sf.info(p).frames for p in todo}
+        todo.sort(key=frames.__getitem__)
+
+        backbone = Wav2Vec2Model.from_pretrained(self.model_name).to(device).eval()
+        batches = _batches(todo, frames, batch_size, exact=not masks_padding(backbone))
+
+        shard = self._next_shard()
+        rows: List[np.ndarray] = []
+        keys: List[str] = []
+        added = 0
+
+        def _flush():
+            nonlocal shard, rows, keys
+            if not rows:
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.dir / f"shard_{shard:05d}.tmp.npy"
+            np.save(tmp, np.stack(rows).astype(FEATURE_DTYPE))
+            os.replace(tmp, self._shard_path(shard))
+            for row, key in enumerate(keys):
+                self.index[key] = [shard, row]
+            self._save_index()          # commit point for this shard
+            shard, rows, keys = shard + 1, [], []
+
+        done = 0
+        with torch.inference_mode():
+            for batch_paths in batches:
+                audios = [torch.from_numpy(_read_audio(p)) for p in batch_paths]
+                lengths = torch.tensor([len(a) for a in audios])
+                audio = torch.nn.utils.rnn.pad_sequence(audios, batch_first=True).to(device)
+
+                pooled = masked_mean_pool(backbone, audio, lengths).float().cpu().numpy()
+
+                for p, vec in zip(batch_paths, pooled):
+                    rows.append(vec)
+                    keys.append(path_key(p))
+                    added += 1
+                    if len(rows) >= SHARD_ROWS:
+                        _flush()
+
+                done += len(batch_paths)
+                print(f"🧠 Cached {done}/{len(todo)}")
+
+        _flush()
+        return added
+
+
+# ------------------ CLI ------------------
+
+def main(manifests: List[str], batch_size: int, device: str):
+    from scripts.phase3_dataset import UnifiedVoiceDataset
+
+    dataset = UnifiedVoiceDataset(manifest_paths=manifests)
+    added = BackboneFeatureCache().build(
+        [s["path"] for s in dataset.samples],
+        batch_size=batch_size,
+        device=device,
+    )
+    print(f"✅ Feature cache ready | new: {added} | total samples: {len(dataset)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("manifests", nargs="+", help="Manifest CSVs (relative to project root)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--device", default="cpu")
+
+    args = parser.parse_args()
+    main(args.manifests, args.batch_size, args.device)
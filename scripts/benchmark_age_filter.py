@@ -0,0 +1,72 @@
+# scripts/benchmark_age_filter.py
+"""
+Runtime + spectral-distance comparison of the age filter modes.
+
+Distance is the mean absolute log-mel error (dB) between each output
+and the intended target envelope (input log-mel + age delta).
+
+Usage:
+    python -m scripts.benchmark_age_filter <wav> [--ages 8 70 85] [--repeats 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import librosa
+
+from scripts.age_filter_apply import (
+    FMAX, FMIN, HOP_LENGTH, MODES, N_MELS, SR, age_log_mel_delta, filter_audio,
+)
+
+
+def _log_mel(y: np.ndarray, sr: int) -> np.ndarray:
+    mel = librosa.feature.melspectrogram(
+        y=y, sr=sr, n_mels=N_MELS, fmin=FMIN, fmax=FMAX, hop_length=HOP_LENGTH,
+    )
+    return np.log(mel + 1e-6)
+
+
+def spectral_distance_db(y_out: np.ndarray, target_log_mel: np.ndarray, sr: int) -> float:
+    out = _log_mel(y_out, sr)
+    n = min(out.shape[1], target_log_mel.shape[1])
+    out, target = out[:, :n], target_log_mel[:, :n]
+
+    # outputs are peak-normalized: compare envelopes, not absolute level
+    out = out - out.mean()
+    target = target - target.mean()
+    return float(np.mean(np.abs(out - target)) * 10.0 / np.log(10.0))
+
+
+def main(wav_path: str, ages, repeats: int):
+    y, sr = librosa.load(wav_path, sr=SR)
+    base = _log_mel(y, sr)
+    print(f"🎧 {wav_path}: {len(y) / sr:.1f}s @ {sr} Hz")
+
+    for age in ages:
+        target = base + age_log_mel_delta(age)[:, None]
+        print(f"\n🔹 target_age={age}")
+
+        for mode in MODES:
+            times = []
+            for _ in range(repeats):
+                t0 = time.perf_counter()
+                y_out = filter_audio(y, sr, age, mode=mode)
+                times.append(time.perf_counter() - t0)
+
+            dist = spectral_distance_db(y_out, target, sr)
+            print(
+                f"  {mode:<11} {min(times) * 1000:8.1f} ms   "
+                f"RTF {min(times) / (len(y) / sr):.3f}   "
+                f"log-mel err {dist:.2f} dB"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("wav", help="Input speech clip")
+    parser.add_argument("--ages", type=int, nargs="+", default=[8, 70, 85])
+    parser.add_argument("--repeats", type=int, default=3)
+
+    args = parser.parse_args()
+    main(args.wav, args.ages, args.repeats)
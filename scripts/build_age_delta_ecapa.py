@@ -1,11 +1,22 @@
 
+import sys
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from embed_ecapa import extract_embedding
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.config_loader import CONFIG
+from scripts.embedding_engine import get_embedding_engine
+from scripts.age_trajectory import refresh_all_trajectories
 
 META = Path("datasets/common_voice/age_audio/all_age_metadata.csv")
 OUT = Path("embeddings/age_deltas.npy")
+BATCH_SIZE = CONFIG.get("embedding", {}).get("batch_size", 16)
+
+engine = get_embedding_engine()
 
 df = pd.read_csv(META)
 
@@ -14,12 +25,18 @@ for age in df["age_group"].unique():
     embs = []
     sub = df[df["age_group"] == age]
 
-    for p in sub["audio_path"].values[:200]:  # cap for RAM safety
+    paths = list(sub["audio_path"].values[:200])  # cap for RAM safety
+    for i in range(0, len(paths), BATCH_SIZE):
+        chunk = paths[i:i + BATCH_SIZE]
         try:
-            emb = extract_embedding(Path(p))
-            embs.append(emb)
+            embs.extend(engine.embed_batch(chunk))
         except Exception:
-            continue
+            # fall back to per-file so one bad clip doesn't drop the batch
+            for p in chunk:
+                try:
+                    embs.append(engine.embed(p))
+                except Exception:
+                    continue
 
     groups[age] = np.mean(embs, axis=0)
 
@@ -32,4 +49,7 @@ deltas = {
 np.save(OUT, deltas)
 print("✅ ECAPA age deltas saved")
 print("Keys:", deltas.keys())
-print("Delta shape:", deltas["children_to_adult"].shape)
\ No newline at end of file
+print("Delta shape:", deltas["children_to_adult"].shape)
+
+# trajectory tables embed the old deltas; playback only reads them
+print("Trajectories refreshed:", refresh_all_trajectories())
\ No newline at end of file
@@ -2,16 +2,27 @@
 import soundfile as sf
 from pathlib import Path
 
-def extract_device_fingerprint(audio_path: str) -> dict:
-    audio_path = Path(audio_path)
-    info = sf.info(audio_path)
-
-    duration_bucket = round(info.duration, 1)
+from scripts.audio_clip import AudioClip
+
+def extract_device_fingerprint(audio_path) -> dict:
+    if isinstance(audio_path, AudioClip):
+        # header captured at decode time, no second open
+        clip = audio_path
+        if not clip.has_header:
+            raise ValueError("AudioClip has no source header")
+        sample_rate, channels = clip.orig_sr, clip.channels
+        subtype, duration = clip.subtype, clip.orig_duration
+    else:
+        info = sf.info(Path(audio_path))
+        sample_rate, channels = info.samplerate, info.channels
+        subtype, duration = info.subtype, info.duration
+
+    duration_bucket = round(duration, 1)
 
     fingerprint = {
-        "sample_rate": info.samplerate,
-        "channels": info.channels,
-        "subtype": info.subtype,   # PCM_16, PCM_24, FLOAT
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "subtype": subtype,   # PCM_16, PCM_24, FLOAT
         "duration_bucket": duration_bucket
     }
 
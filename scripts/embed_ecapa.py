@@ -1,35 +1,24 @@
-import torch
-import torchaudio
+import sys
 import numpy as np
-from speechbrain.pretrained import EncoderClassifier
 from pathlib import Path
 import argparse
 
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-classifier = EncoderClassifier.from_hparams(
-    source="speechbrain/spkrec-ecapa-voxceleb",
-    run_opts={"device": DEVICE}
-)
+from scripts.embedding_engine import get_embedding_engine
 
-def load_audio(path, target_sr=16000):
-    audio, sr = torchaudio.load(path)
-
-    if sr != target_sr:
-        audio = torchaudio.functional.resample(audio, sr, target_sr)
 
-    if audio.shape[0] > 1:
-        audio = audio.mean(dim=0, keepdim=True)
+def load_audio(path, target_sr=16000):
+    return get_embedding_engine().load_audio(path, sr=target_sr)
 
-    return audio
+def extract_embedding(audio):
+    # path or 16 kHz mono array; model is loaded once per process
+    return get_embedding_engine().embed(audio)
 
-def extract_embedding(audio_path: Path):
-    signal = load_audio(audio_path)
-    with torch.no_grad():
-        emb = classifier.encode_batch(signal)
-    emb = emb.squeeze().cpu().numpy()
-    emb = emb / np.linalg.norm(emb)
-    return emb
+def extract_embeddings(audios):
+    return get_embedding_engine().embed_batch(list(audios))
 
 def main(args):
     audio_path = Path(args.audio)
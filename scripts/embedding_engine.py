@@ -0,0 +1,162 @@
+# scripts/embedding_engine.py
+
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from scripts.audio_clip import AudioClip
+from scripts.config_loader import CONFIG
+
+# ------------------ CONFIG ------------------
+
+_EMB_CFG = CONFIG.get("embedding", {})
+
+MODEL_SOURCE = _EMB_CFG.get("model_source", "speechbrain/spkrec-ecapa-voxceleb")
+MODEL_SAVEDIR = _EMB_CFG.get("savedir", "tmp_sbp_spkrec")
+NUM_THREADS = _EMB_CFG.get("num_threads")
+TARGET_SR = 16000
+
+AudioInput = Union[str, Path, np.ndarray, AudioClip]
+
+
+# ------------------ ENGINE ------------------
+
+class EmbeddingEngine:
+    """
+    Process-resident ECAPA speaker encoder.
+
+    The SpeechBrain model is loaded lazily on the first embed call and
+    then reused for every later call in this process.
+    """
+
+    def __init__(
+        self,
+        source: str = MODEL_SOURCE,
+        device: Optional[str] = None,
+        num_threads: Optional[int] = NUM_THREADS,
+        savedir: str = MODEL_SAVEDIR,
+    ):
+        self.source = source
+        self.device = device
+        self.num_threads = num_threads
+        self.savedir = savedir
+        self._classifier = None
+        self._lock = threading.Lock()
+
+    # ------------------ MODEL ------------------
+
+    def _load(self):
+        if self._classifier is not None:
+            return self._classifier
+
+        with self._lock:
+            if self._classifier is None:
+                import torch
+                from speechbrain.pretrained import EncoderClassifier
+
+                if self.num_threads:
+                    torch.set_num_threads(int(self.num_threads))
+
+                if self.device is None:
+                    self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+                self._classifier = EncoderClassifier.from_hparams(
+                    source=self.source,
+                    run_opts={"device": self.device},
+                    savedir=self.savedir,
+                )
+        return self._classifier
+
+    @property
+    def loaded(self) -> bool:
+        return self._classifier is not None
+
+    # ------------------ AUDIO ------------------
+
+    @staticmethod
+    def load_audio(audio: AudioInput, sr: int = TARGET_SR) -> np.ndarray:
+        """
+        Returns a mono float32 waveform at 16 kHz.
+        Arrays are assumed to already be 16 kHz mono.
+        """
+        if isinstance(audio, AudioClip):
+            signal = audio.samples
+        elif isinstance(audio, np.ndarray):
+            signal = audio
+        else:
+            import torchaudio
+
+            wav, file_sr = torchaudio.load(str(audio))
+            if wav.shape[0] > 1:
+                wav = wav.mean(dim=0, keepdim=True)
+            if file_sr != sr:
+                wav = torchaudio.functional.resample(wav, file_sr, sr)
+            signal = wav.squeeze(0).numpy()
+
+        if signal.ndim > 1:
+            signal = signal.mean(axis=-1)
+        return np.ascontiguousarray(signal, dtype=np.float32)
+
+    # ------------------ EMBEDDING ------------------
+
+    def embed(self, audio: AudioInput) -> np.ndarray:
+        """
+        Returns an L2-normalized embedding for one path or waveform.
+        """
+        return self.embed_batch([audio])[0]
+
+    def embed_batch(self, audios: List[AudioInput]) -> np.ndarray:
+        """
+        Embeds several clips in one forward pass.
+
+        Clips are zero-padded to the longest one and SpeechBrain is given
+        relative lengths (wav_lens) so padding does not leak into the
+        statistics pooling. Returns an (N, D) float32 matrix of
+        L2-normalized rows.
+        """
+        if not audios:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        import torch
+
+        classifier = self._load()
+        signals = [self.load_audio(a) for a in audios]
+
+        lengths = np.array([len(s) for s in signals], dtype=np.int64)
+        max_len = int(lengths.max())
+
+        batch = np.zeros((len(signals), max_len), dtype=np.float32)
+        for i, s in enumerate(signals):
+            batch[i, : len(s)] = s
+
+        wavs = torch.from_numpy(batch).to(self.device)
+        wav_lens = torch.from_numpy(lengths / max(max_len, 1)).float().to(self.device)
+
+        with torch.no_grad():
+            emb = classifier.encode_batch(wavs, wav_lens)
+
+        emb = emb.squeeze(1).cpu().numpy().astype(np.float32)
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return emb / norms
+
+
+# ------------------ SHARED INSTANCE ------------------
+
+_ENGINE: Optional[EmbeddingEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_embedding_engine(device: Optional[str] = None) -> EmbeddingEngine:
+    """
+    Returns the process-wide engine shared by ingest, FAISS detection
+    and the manifest tools. `device` only applies to the first call.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = EmbeddingEngine(device=device or _EMB_CFG.get("device"))
+    return _ENGINE
@@ -0,0 +1,234 @@
+# scripts/embedding_store.py
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from scripts.config_loader import CONFIG
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: in-process locking only
+    fcntl = None
+
+# ------------------ PATH ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+STORE_DIR = PROJECT_ROOT / "versions" / "embeddings"
+
+STORE_DTYPE = CONFIG.get("embedding", {}).get("store_dtype", "float32")
+REF_SEP = "#"
+
+_LOCKS = {}
+_LOCKS_GUARD = threading.Lock()
+
+
+def _thread_lock(key: str) -> threading.Lock:
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(key, threading.Lock())
+
+
+# ------------------ STORE ------------------
+
+class EmbeddingStore:
+    """
+    Append-only packed embedding matrix for one user.
+
+    versions/embeddings/<id>.emb       raw (rows x dim) float32/float16
+    versions/embeddings/<id>.emb.meta  dim, dtype, committed row count
+                                       and row -> version_id map
+
+    Readers only trust `rows` from the header, so bytes from an
+    interrupted append are invisible and get truncated by the next one.
+    """
+
+    def __init__(self, user_id: str, store_dir: Path = STORE_DIR, dtype: str = STORE_DTYPE):
+        self.user_id = user_id
+        self.data_path = Path(store_dir) / f"{user_id}.emb"
+        self.meta_path = Path(store_dir) / f"{user_id}.emb.meta"
+        self.lock_path = Path(store_dir) / f"{user_id}.emb.lock"
+        self.default_dtype = dtype
+        self._meta = None
+        self._meta_mtime = None
+
+    # ------------------ HEADER ------------------
+
+    def _load_meta(self) -> Optional[dict]:
+        try:
+            mtime = self.meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._meta, self._meta_mtime = None, None
+            return None
+
+        if self._meta is None or mtime != self._meta_mtime:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+            self._meta_mtime = mtime
+        return self._meta
+
+    def _write_meta(self, meta: dict):
+        tmp = self.meta_path.with_suffix(".meta.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.meta_path)
+        self._meta, self._meta_mtime = None, None
+
+    @contextmanager
+    def _locked(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with _thread_lock(str(self.lock_path)):
+            with open(self.lock_path, "a") as lf:
+                if fcntl is not None:
+                    fcntl.flock(lf, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lf, fcntl.LOCK_UN)
+
+    # ------------------ READ ------------------
+
+    @property
+    def exists(self) -> bool:
+        return self._load_meta() is not None
+
+    @property
+    def version_ids(self) -> List[str]:
+        meta = self._load_meta()
+        return list(meta["version_ids"]) if meta else []
+
+    def __len__(self) -> int:
+        meta = self._load_meta()
+        return meta["rows"] if meta else 0
+
+    def matrix(self) -> Optional[np.ndarray]:
+        """
+        Zero-copy read-only (rows x dim) view over the packed file.
+        """
+        meta = self._load_meta()
+        if not meta or meta["rows"] == 0:
+            return None
+        return np.memmap(
+            self.data_path,
+            dtype=meta["dtype"],
+            mode="r",
+            shape=(meta["rows"], meta["dim"]),
+        )
+
+    def row_of(self, version_id) -> Optional[int]:
+        meta = self._load_meta()
+        if not meta:
+            return None
+        try:
+            return meta["version_ids"].index(str(version_id))
+        except ValueError:
+            return None
+
+    def get(self, version_id) -> Optional[np.ndarray]:
+        row = self.row_of(version_id)
+        if row is None:
+            return None
+        return np.array(self.matrix()[row], dtype="float32")
+
+    def ref(self, version_id) -> str:
+        """
+        Value stored in a version's `embedding_path`.
+        """
+        try:
+            rel = self.data_path.relative_to(PROJECT_ROOT)
+        except ValueError:
+            rel = self.data_path
+        return f"{rel}{REF_SEP}{version_id}"
+
+    # ------------------ WRITE ------------------
+
+    def append(self, version_id, embedding: np.ndarray) -> str:
+        """
+        Atomically appends one row; returns its `embedding_path` ref.
+        """
+        with self._locked():
+            meta = self._load_meta()
+            emb = np.asarray(embedding).reshape(-1)
+
+            if meta is None:
+                meta = {
+                    "dim": int(emb.shape[0]),
+                    "dtype": self.default_dtype,
+                    "rows": 0,
+                    "version_ids": [],
+                }
+            elif emb.shape[0] != meta["dim"]:
+                raise ValueError(f"Embedding dim {emb.shape[0]} != store dim {meta['dim']}")
+
+            row = emb.astype(meta["dtype"]).tobytes()
+            offset = meta["rows"] * len(row)
+
+            self.data_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.data_path, "ab") as f:
+                pass
+            with open(self.data_path, "r+b") as f:
+                f.truncate(offset)  # drop bytes of any interrupted append
+                f.seek(offset)
+                f.write(row)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # commit point: header rename makes the row visible
+            meta = dict(meta)
+            meta["rows"] += 1
+            meta["version_ids"] = list(meta["version_ids"]) + [str(version_id)]
+            self._write_meta(meta)
+
+        return self.ref(version_id)
+
+
+# ------------------ EMBEDDING REFS ------------------
+
+def load_embedding_ref(embedding_path: str) -> Optional[np.ndarray]:
+    """
+    Resolves a version's `embedding_path`: either a packed-store ref
+    ("versions/embeddings/<id>.emb#<version_id>") or a legacy .npy file.
+    """
+    if not embedding_path:
+        return None
+
+    if REF_SEP in embedding_path:
+        data_rel, version_id = embedding_path.rsplit(REF_SEP, 1)
+        data_path = PROJECT_ROOT / data_rel
+        store = EmbeddingStore(data_path.stem, store_dir=data_path.parent)
+        return store.get(version_id)
+
+    full = PROJECT_ROOT / embedding_path
+    if not full.exists():
+        return None
+    return np.load(full).astype("float32")
+
+
+def load_reference_matrix(user_id: str, versions: list) -> np.ndarray:
+    """
+    Reference embeddings for `versions` as one (N x D) array.
+
+    When every version lives in the packed store this is the memmap view
+    itself (no copy); legacy .npy versions are loaded individually.
+    """
+    wanted = [v for v in versions if v.get("embedding_path")]
+    store = EmbeddingStore(user_id)
+    matrix = store.matrix()
+
+    if matrix is not None:
+        ids = store.version_ids
+        if [str(v["version_id"]) for v in wanted] == ids:
+            return matrix
+
+    rows = [load_embedding_ref(v["embedding_path"]) for v in wanted]
+    rows = [r for r in rows if r is not None]
+    if not rows:
+        return np.zeros((0, 0), dtype="float32")
+    return np.vstack(rows).astype("float32")
@@ -20,9 +20,13 @@ if str(SCRIPTS_DIR) not in sys.path:
 from audio_quality import audio_quality_gate
 from speaker_verification import speaker_verification_gate
 from device_fingerprint import extract_device_fingerprint, device_match_score
+from scripts.audio_clip import AudioClip
 from scripts.confidence_engine import compute_confidence
+from scripts.embedding_engine import get_embedding_engine
+from scripts.embedding_store import load_reference_matrix
 from scripts.version_decision import decide_voice_version
 from user_registry import UserRegistry
+from scripts.user_faiss_index import UserFaissIndex
 
 try:
     from register_version import register_version
@@ -75,29 +79,26 @@ def detect_change(user_id: str, new_embedding: np.ndarray) -> Tuple[bool, float]
     if not versions:
         return True, 0.0
 
-    embeddings = []
-    for v in versions:
-        emb_rel = v.get("embedding_path")
-        if not emb_rel:
-            continue   # sparse data case
+    # Persisted per-user index; no .npy reads once it is warm
+    sims, _ = UserFaissIndex(user_id).search(new_embedding, versions, k=1)
 
-        emb_path = PROJECT_ROOT / emb_rel
-        if emb_path.exists():
-            embeddings.append(normalize(load_embedding(emb_path)))
-
-    if not embeddings:
+    if not sims:
         return True, 0.0
 
-    index = build_index(embeddings)
-    new_emb = normalize(new_embedding)
-
-    D, _ = index.search(np.expand_dims(new_emb, 0), 1)
-    best_sim = float(D[0][0])
+    best_sim = sims[0]
 
     change_detected = best_sim < THRESHOLD
     return change_detected, best_sim
 
 
+def detect_change_from_audio(user_id: str, audio) -> Tuple[bool, float]:
+    """
+    Same as detect_change(), embedding a path or 16 kHz array with the
+    shared process-wide ECAPA engine.
+    """
+    return detect_change(user_id, get_embedding_engine().embed(audio))
+
+
 # ------------------ CLI / BATCH MODE ------------------
 
 def read_manifest():
@@ -123,12 +124,9 @@ def main(threshold: float = THRESHOLD) -> int:
         print("❌ No embeddings found")
         return 1
 
-    # Load existing versions
-    version_embs = []
-    for v in user.get_voice_versions():
-        p = PROJECT_ROOT / v["embedding_path"]
-        if p.exists():
-            version_embs.append(normalize(load_embedding(p)))
+    # Load existing versions (single packed view)
+    ref_matrix = load_reference_matrix(user.user_id, user.get_versions())
+    version_embs = [normalize(np.asarray(e, dtype="float32")) for e in ref_matrix]
 
     index = build_index(version_embs)
 
@@ -149,8 +147,13 @@ def main(threshold: float = THRESHOLD) -> int:
         if not audio_path.exists():
             continue
 
+        try:
+            clip = AudioClip.from_file(str(audio_path))
+        except Exception:
+            continue
+
         # ---- Quality Gate ----
-        quality = audio_quality_gate(str(audio_path), dev_mode=True)
+        quality = audio_quality_gate(clip, dev_mode=True)
         if not quality["accepted"]:
             continue
 
@@ -164,7 +167,7 @@ def main(threshold: float = THRESHOLD) -> int:
         try:
             ref = next(VERSIONS_AUDIO_DIR.glob("*.wav"))
             device_score = device_match_score(
-                extract_device_fingerprint(str(audio_path)),
+                extract_device_fingerprint(clip),
                 extract_device_fingerprint(str(ref)),
             )
         except StopIteration:
@@ -201,6 +204,7 @@ def main(threshold: float = THRESHOLD) -> int:
             audio_path=str(audio_path.relative_to(PROJECT_ROOT)),
             confidence=confidence,
             voice_type="RECORDED",
+            embedding=emb,
         )
 
         print("✅ Version created:", emb_path.name)
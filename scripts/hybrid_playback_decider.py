@@ -1,6 +1,8 @@
 # scripts/hybrid_playback_decider.py
 
 import sys
+import threading
+from collections import OrderedDict
 from pathlib import Path
 import numpy as np
 
@@ -10,22 +12,166 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
 # ------------------ IMPORTS ------------------
-from scripts.user_registry import UserRegistry
+from scripts.user_registry import UserRegistry, user_revision
 from scripts.smart_version_selector import select_best_version
 from scripts.age_selector import classify_age_relation
+from scripts.embedding_store import load_embedding_ref
+from scripts.age_trajectory import (
+    AgeTrajectory, INTERPOLATED, NONE, RECORDED, aged_embedding,
+)
 
 # ------------------ CONSTANTS ------------------
 AGE_DELTAS_PATH = PROJECT_ROOT / "embeddings" / "age_deltas.npy"
 EMB_DIR = PROJECT_ROOT / "versions" / "embeddings"
 
+MEMO_SLOTS = 4096
 
-def decide_playback_mode(user_id: str, target_age: int) -> dict:
+# ------------------ PROCESS CACHES ------------------
+
+_LOCK = threading.Lock()
+_DELTAS = {"stamp": None, "table": None}
+_USERS = {}                    # user_id -> (revision, versions, latest)
+_AGED = OrderedDict()          # (user_id, version_id, target_age, delta_stamp) -> (embedding, alpha)
+_DECISIONS = OrderedDict()     # (user_id, revision, target_age, delta_stamp) -> decision
+
+
+def _memo_put(memo: OrderedDict, key, value):
+    memo[key] = value
+    memo.move_to_end(key)
+    while len(memo) > MEMO_SLOTS:
+        memo.popitem(last=False)
+
+
+def load_age_deltas():
     """
-    Phase-2 playback decision logic
+    Returns (delta_table, stamp). The .npy is re-read only when its
+    mtime/size change; the stamp versions the aged-embedding memo.
     """
+    try:
+        st = AGE_DELTAS_PATH.stat()
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None, None
+
+    with _LOCK:
+        if _DELTAS["stamp"] == stamp:
+            return _DELTAS["table"], stamp
+
+    table = np.load(AGE_DELTAS_PATH, allow_pickle=True).item()
+    with _LOCK:
+        _DELTAS["stamp"], _DELTAS["table"] = stamp, table
+    return table, stamp
+
+
+def _user_versions(user_id: str):
+    """
+    (revision, versions, latest) for a user; the record is only
+    re-loaded when its revision stamp moves.
+    """
+    rev = user_revision(user_id)
+    with _LOCK:
+        cached = _USERS.get(user_id)
+    if cached is not None and rev is not None and cached[0] == rev:
+        return cached
 
     user = UserRegistry(user_id)
-    versions = user.get_versions()
+    rev = user_revision(user_id)
+    entry = (rev, user.get_versions(), user.get_latest_version())
+    with _LOCK:
+        _USERS[user_id] = entry
+    return entry
+
+
+def clear_playback_cache():
+    with _LOCK:
+        _DELTAS["stamp"], _DELTAS["table"] = None, None
+        _USERS.clear()
+        _AGED.clear()
+        _DECISIONS.clear()
+
+
+def decide_playback_mode(user_id: str, target_age: int) -> dict:
+    """
+    Phase-2 playback decision logic (memoized).
+
+    Answered from the user's precomputed age trajectory when it covers
+    `target_age`; otherwise the original select-then-age path runs.
+
+    Repeat queries for the same user/age are answered from a process
+    memo; it is keyed on the user's revision stamp and the delta-table
+    stamp, so new versions or a rebuilt delta table invalidate it.
+    """
+
+    revision, versions, latest = _user_versions(user_id)
+    age_deltas, delta_stamp = load_age_deltas()
+    memo_key = (user_id, revision, target_age, delta_stamp)
+
+    with _LOCK:
+        hit = _DECISIONS.get(memo_key)
+        if hit is not None:
+            _DECISIONS.move_to_end(memo_key)
+    if hit is not None:
+        return dict(hit)
+
+    decision = _decide_from_trajectory(user_id, versions, target_age, age_deltas, delta_stamp)
+    if decision is None:
+        decision = _decide(user_id, versions, latest, target_age)
+    if revision is not None:
+        with _LOCK:
+            _memo_put(_DECISIONS, memo_key, decision)
+    return dict(decision)
+
+
+def _decide_from_trajectory(user_id, versions, target_age, age_deltas, delta_stamp):
+    """
+    Table read from the user's age trajectory; None when the table
+    cannot answer (stale or missing table, age out of range, missing
+    delta). Read-only: tables are rebuilt when versions are registered
+    (UserRegistry) or the delta table changes (refresh_all_trajectories),
+    never on the playback path.
+    """
+    try:
+        traj = AgeTrajectory(user_id)
+        if not traj.is_current(versions, delta_stamp):
+            return None
+        row = traj.lookup(target_age)
+    except Exception:
+        return None
+
+    if row is None or row["label"] == NONE:
+        return None
+
+    version = next((v for v in versions if str(v["version_id"]) == row["version_id"]), None)
+    if version is None:
+        return None
+
+    if row["label"] == RECORDED:
+        return {
+            "mode": "RECORDED",
+            "version": version,
+            "reason": "real_voice_close_to_target",
+            "age_gap": abs(version["age_at_recording"] - target_age),
+            "confidence": row["confidence"],
+        }
+
+    return {
+        "mode": "AGED",
+        "embedding": row["embedding"],
+        "base_version": version,
+        "target_age": target_age,
+        "alpha": row["alpha"],
+        "relation": classify_age_relation(version["age_at_recording"], target_age),
+        "label": row["label"],
+        "confidence": row["confidence"],
+        "reason": (
+            "trajectory_interpolated"
+            if row["label"] == INTERPOLATED
+            else "age_delta_applied"
+        ),
+    }
+
+
+def _decide(user_id: str, versions: list, base_version, target_age: int) -> dict:
 
     if not versions:
         return {"mode": "NONE", "reason": "no_voice_versions"}
@@ -46,7 +192,6 @@ def decide_playback_mode(user_id: str, target_age: int) -> dict:
         }
 
     # ---- AGED PATH ----
-    base_version = user.get_latest_version()
     if not base_version or not base_version.get("embedding_path"):
         return {"mode": "NONE", "reason": "no_embedding_available"}
 
@@ -60,29 +205,30 @@ def decide_playback_mode(user_id: str, target_age: int) -> dict:
             "reason": "same_age_requested",
         }
 
-    # Load base embedding
-    base_emb = np.load(PROJECT_ROOT / base_version["embedding_path"])
-    base_emb /= np.linalg.norm(base_emb)
-
-    # ✅ Load age deltas (FIXED)
-    age_deltas = np.load(AGE_DELTAS_PATH, allow_pickle=True).item()
-
-    delta_key = (
-        "children_to_adult"
-        if relation == "future"
-        else "adult_to_children"
-    )
-
-    if delta_key not in age_deltas:
-        return {"mode": "NONE", "reason": f"missing_delta:{delta_key}"}
-
-    delta = age_deltas[delta_key]
-
-    years = abs((base_age or target_age) - target_age)
-    alpha = min(years / 40.0, 1.0)
-
-    aged_emb = base_emb + alpha * delta
-    aged_emb /= np.linalg.norm(aged_emb)
+    # ✅ Load age deltas (process-cached)
+    age_deltas, delta_stamp = load_age_deltas()
+    if age_deltas is None:
+        return {"mode": "NONE", "reason": "missing_age_deltas"}
+
+    # version ids are only unique per user ("v1", "v2", ...)
+    aged_key = (user_id, str(base_version["version_id"]), target_age, delta_stamp)
+    with _LOCK:
+        aged_emb, alpha = _AGED.get(aged_key, (None, None))
+
+    if aged_emb is None:
+        # Load base embedding
+        base_emb = load_embedding_ref(base_version["embedding_path"])
+        if base_emb is None:
+            return {"mode": "NONE", "reason": "no_embedding_available"}
+
+        try:
+            aged_emb, alpha, _ = aged_embedding(base_emb, base_age, target_age, age_deltas)
+        except KeyError as e:
+            return {"mode": "NONE", "reason": f"missing_delta:{e.args[0]}"}
+        aged_emb.setflags(write=False)   # shared across callers
+
+        with _LOCK:
+            _memo_put(_AGED, aged_key, (aged_emb, alpha))
 
     return {
     "mode": "AGED",
@@ -0,0 +1,34 @@
+# scripts/import_users_to_sqlite.py
+
+import sys
+import argparse
+from pathlib import Path
+
+# ------------------ PATH SETUP ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ------------------ IMPORTS ------------------
+
+from scripts.user_storage import SqliteUserBackend, SQLITE_PATH, USERS_DIR, import_json_users
+
+# ------------------ MAIN ------------------
+
+def main(args) -> int:
+    backend = SqliteUserBackend(Path(args.db))
+    n = import_json_users(Path(args.users_dir), backend=backend, overwrite=args.overwrite)
+
+    print(f"✅ Imported {n} users into {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users-dir", default=str(USERS_DIR))
+    parser.add_argument("--db", default=str(SQLITE_PATH))
+    parser.add_argument("--overwrite", action="store_true", help="Replace users already in the database")
+    args = parser.parse_args()
+
+    sys.exit(main(args))
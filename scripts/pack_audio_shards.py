@@ -0,0 +1,149 @@
+# scripts/pack_audio_shards.py
+"""
+One-time packing of training manifests into audio shards.
+
+Every manifest sample is decoded, down-mixed and resampled to 16 kHz
+once, then appended to flat int16 / float16 shard files so training
+reads samples straight from np.memmap instead of decoding FLAC/WAV
+per step.
+
+<out>/pack.json               sample rate, dtype, shard list, per-sample
+                              metadata (path, speaker_idx, age, shard, row)
+<out>/shard_00000.bin         concatenated samples
+<out>/shard_00000.idx.npy     (rows x 2) int64: [offset, length] in samples
+
+Usage:
+    python -m scripts.pack_audio_shards data/librispeech_manifest_small.csv \
+        --out data/shards/librispeech_small --dtype int16
+"""
+
+import argparse
+import json
+import os
+import sys
+from glob import glob
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import soundfile as sf
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.audio_clip import resample
+
+# ------------------ CONSTANTS ------------------
+
+TARGET_SR = 16000
+SHARD_BYTES = 512 * 1024 ** 2
+DTYPES = ("int16", "float16")
+
+
+def encode(audio: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == "int16":
+        return (np.clip(audio, -1.0, 1.0) * 32767.0).round().astype(np.int16)
+    return audio.astype(np.float16)
+
+
+def decode(samples: np.ndarray) -> np.ndarray:
+    """
+    Shard samples -> float32 in [-1, 1].
+    """
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32767.0
+    return samples.astype(np.float32)
+
+
+def _load(path: str) -> np.ndarray:
+    audio, sr = sf.read(path, dtype="float32")
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+    return resample(audio, sr, TARGET_SR)
+
+
+def pack(manifests: List[str], out_dir: Path, dtype: str = "int16", shard_bytes: int = SHARD_BYTES) -> dict:
+    from scripts.phase3_dataset import UnifiedVoiceDataset
+
+    if dtype not in DTYPES:
+        raise ValueError(f"dtype must be one of {DTYPES}")
+
+    samples = UnifiedVoiceDataset(manifest_paths=manifests).samples
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    itemsize = np.dtype(dtype).itemsize
+    shards, items = [], []
+    shard, offset, index, f = 0, 0, [], None
+
+    def _close_shard():
+        nonlocal f, index
+        if f is None:
+            return
+        f.close()
+        np.save(out_dir / f"shard_{shard:05d}.idx.npy", np.asarray(index, dtype=np.int64).reshape(-1, 2))
+        shards.append({"file": f"shard_{shard:05d}.bin", "samples": offset, "rows": len(index)})
+        f, index = None, []
+
+    for i, s in enumerate(samples):
+        try:
+            audio = encode(_load(s["path"]), dtype)
+        except Exception as e:
+            print(f"⚠️ Skipping {s['path']}: {e}")
+            continue
+
+        if f is not None and (offset + len(audio)) * itemsize > shard_bytes:
+            _close_shard()
+            shard += 1
+        if f is None:
+            f = open(out_dir / f"shard_{shard:05d}.bin", "wb")
+            offset = 0
+
+        f.write(audio.tobytes())
+        items.append({
+            "path": s["path"],
+            "speaker_idx": s["speaker_idx"],
+            "age": s["age"],
+            "shard": shard,
+            "row": len(index),
+        })
+        index.append((offset, len(audio)))
+        offset += len(audio)
+
+        if (i + 1) % 500 == 0:
+            print(f"📦 Packed {i + 1}/{len(samples)}")
+
+    _close_shard()
+
+    meta = {
+        "sample_rate": TARGET_SR,
+        "dtype": dtype,
+        "shards": shards,
+        "items": items,
+    }
+    tmp = out_dir / "pack.json.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, out_dir / "pack.json")   # pack is usable only once complete
+
+    print(f"✅ Packed {len(items)} samples into {len(shards)} shard(s) → {out_dir}")
+    return meta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "manifests", nargs="*",
+        help="Manifest CSVs relative to project root (default: data/*manifest*.csv)",
+    )
+    parser.add_argument("--out", required=True, help="Output pack directory")
+    parser.add_argument("--dtype", choices=DTYPES, default="int16")
+    parser.add_argument("--shard-mb", type=int, default=SHARD_BYTES // 1024 ** 2)
+
+    args = parser.parse_args()
+    manifests = args.manifests or [
+        str(Path(p).relative_to(PROJECT_ROOT))
+        for p in sorted(glob(str(PROJECT_ROOT / "data" / "*manifest*.csv")))
+    ]
+    pack(manifests, Path(args.out), args.dtype, args.shard_mb * 1024 ** 2)
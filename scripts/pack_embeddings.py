@@ -0,0 +1,70 @@
+# scripts/pack_embeddings.py
+
+import sys
+import argparse
+from pathlib import Path
+
+# ------------------ PATH SETUP ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# ------------------ IMPORTS ------------------
+
+from scripts.user_registry import UserRegistry, list_users
+from scripts.embedding_store import EmbeddingStore, REF_SEP, load_embedding_ref
+
+# ------------------ MAIN ------------------
+
+def pack_user(user_id: str, dtype: str = "float32", delete_npy: bool = False) -> int:
+    """
+    Moves a user's per-version .npy embeddings into the packed store
+    and rewrites each `embedding_path` to the packed ref.
+    Already-packed versions are skipped, so re-running is safe.
+    """
+    user = UserRegistry(user_id)
+    store = EmbeddingStore(user_id, dtype=dtype)
+    packed = set(store.version_ids)
+
+    moved = []
+    for v in user.get_versions():
+        p = v.get("embedding_path")
+        if not p or REF_SEP in p or str(v["version_id"]) in packed:
+            continue
+
+        emb = load_embedding_ref(p)
+        if emb is None:
+            continue
+
+        v["embedding_path"] = store.append(v["version_id"], emb)
+        moved.append(PROJECT_ROOT / p)
+
+    if moved:
+        user._save()
+
+    if delete_npy:
+        for npy in moved:
+            npy.unlink(missing_ok=True)
+
+    return len(moved)
+
+
+def main(args) -> int:
+    user_ids = [args.user] if args.user else list_users()
+
+    for user_id in user_ids:
+        n = pack_user(user_id, dtype=args.dtype, delete_npy=args.delete_npy)
+        print(f"✅ {user_id}: packed {n} embeddings")
+
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user", default=None, help="Single user id (default: all users)")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--delete-npy", action="store_true", help="Remove .npy files once packed")
+    args = parser.parse_args()
+
+    sys.exit(main(args))
@@ -5,7 +5,9 @@ import torch
 def voice_collate_fn(batch):
     """
     Collate function for Phase-3
-    Handles variable-length audio and speaker indices
+    Handles variable-length audio and speaker indices.
+    `lengths` (B,) and `attention_mask` (B, T) mark the real samples,
+    so the model can skip padded frames when pooling.
     """
 
     audios = []
@@ -27,9 +29,28 @@ def voice_collate_fn(batch):
 
     speaker_idxs = torch.tensor(speaker_idxs, dtype=torch.long)
 
+    lengths = torch.tensor([len(item["audio"]) for item in batch], dtype=torch.long)
+    attention_mask = (
+        torch.arange(audios.shape[1])[None, :] < lengths[:, None]
+    ).long()
+
     return {
         "audio": audios,
+        "lengths": lengths,
+        "attention_mask": attention_mask,
         "speaker_idx": speaker_idxs,
         "age": ages,
         "path": paths
-    }
\ No newline at end of file
+    }
+
+def feature_collate_fn(batch):
+    """
+    Collate function for cached backbone features (fixed size, no padding)
+    """
+
+    return {
+        "features": torch.stack([item["features"] for item in batch]),
+        "speaker_idx": torch.tensor([item["speaker_idx"] for item in batch], dtype=torch.long),
+        "age": [item.get("age") for item in batch],
+        "path": [item.get("path") for item in batch]
+    }
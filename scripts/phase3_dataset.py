@@ -2,14 +2,28 @@
 
 import csv
 import json
+import random
+import numpy as np
 import torch
 import soundfile as sf
 from pathlib import Path
-from torch.utils.data import Dataset
+from torch.utils.data import Dataset, IterableDataset, get_worker_info
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
 
+CROP_MODES = ("random", "center", "start")
+
+
+def _crop_start(frames: int, crop: int, mode: str, rng=random) -> int:
+    slack = frames - crop
+    if mode == "random":
+        return rng.randint(0, slack)
+    if mode == "center":
+        return slack // 2
+    return 0
+
+
 class UnifiedVoiceDataset(Dataset):
     """
     Unified dataset for Phase 3
@@ -20,9 +34,19 @@ class UnifiedVoiceDataset(Dataset):
         age: float | None
         path: str
       }
+
+    crop_seconds: if set, only a window of that duration is read from
+    disk (random / center / start per crop_mode); shorter clips are
+    returned whole. Bounds per-sample memory and padding.
     """
 
-    def __init__(self, manifest_paths, max_samples=None):
+    def __init__(self, manifest_paths, max_samples=None, crop_seconds=None, crop_mode="random"):
+        if crop_mode not in CROP_MODES:
+            raise ValueError(f"crop_mode must be one of {CROP_MODES}")
+
+        self.crop_seconds = crop_seconds
+        self.crop_mode = crop_mode
+        self._lengths = None
         self.samples = []
 
         # -------- Load speaker map --------
@@ -71,10 +95,39 @@ class UnifiedVoiceDataset(Dataset):
     def __len__(self):
         return len(self.samples)
 
+    @property
+    def lengths(self):
+        """
+        Frames per sample AS RETURNED (after cropping), from file headers
+        only; used by LengthBucketBatchSampler.
+        """
+        if self._lengths is None:
+            lengths = []
+            for s in self.samples:
+                info = sf.info(s["path"])
+                n = info.frames
+                if self.crop_seconds:
+                    n = min(n, int(self.crop_seconds * info.samplerate))
+                lengths.append(n)
+            self._lengths = lengths
+        return self._lengths
+
+    def _read(self, path):
+        if not self.crop_seconds:
+            return sf.read(path, dtype="float32")
+
+        info = sf.info(path)
+        crop = int(self.crop_seconds * info.samplerate)
+        if info.frames <= crop:
+            return sf.read(path, dtype="float32")
+
+        start = _crop_start(info.frames, crop, self.crop_mode)
+        return sf.read(path, start=start, frames=crop, dtype="float32")
+
     def __getitem__(self, idx):
         item = self.samples[idx]
 
-        audio, sr = sf.read(item["path"])
+        audio, sr = self._read(item["path"])
         if audio.ndim > 1:
             audio = audio.mean(axis=1)
 
@@ -85,4 +138,175 @@ class UnifiedVoiceDataset(Dataset):
             "speaker_idx": item["speaker_idx"],
             "age": item["age"],
             "path": item["path"]
-        }
\ No newline at end of file
+        }
+
+class CachedFeatureDataset(Dataset):
+    """
+    Phase-3 samples served from the frozen-backbone feature cache
+    (scripts/backbone_feature_cache.py) instead of raw audio.
+    Returns:
+      {
+        features: Tensor (768,)
+        speaker_idx: int
+        age: float | None
+        path: str
+      }
+    """
+
+    def __init__(self, base: UnifiedVoiceDataset, cache):
+        missing = [s["path"] for s in base.samples if not cache.has(s["path"])]
+        if missing:
+            raise RuntimeError(
+                f"{len(missing)} samples not in feature cache; "
+                f"run scripts/backbone_feature_cache.py first"
+            )
+
+        self.samples = base.samples
+        # gathered once: epochs then index an in-RAM (N x 768) matrix
+        self.features = (
+            torch.from_numpy(cache.get_many([s["path"] for s in self.samples]))
+            if self.samples
+            else torch.zeros((0, 0))
+        )
+
+        print(f"✅ Cached-feature dataset ready | Samples: {len(self.samples)}")
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __getitem__(self, idx):
+        item = self.samples[idx]
+        return {
+            "features": self.features[idx],
+            "speaker_idx": item["speaker_idx"],
+            "age": item["age"],
+            "path": item["path"]
+        }
+
+
+class ShardedAudioDataset(Dataset):
+    """
+    Map-style dataset over a pack from scripts/pack_audio_shards.py.
+
+    Samples are slices of memory-mapped int16/float16 shards (16 kHz,
+    already mono): no decode, no resample, and the only copy is the
+    float32 conversion of the (optionally cropped) window. Shards are
+    opened lazily per process, so DataLoader workers each map them
+    themselves. Same item format as UnifiedVoiceDataset.
+    """
+
+    def __init__(self, pack_dir, crop_seconds=None, crop_mode="random"):
+        if crop_mode not in CROP_MODES:
+            raise ValueError(f"crop_mode must be one of {CROP_MODES}")
+
+        self.pack_dir = Path(pack_dir)
+        with open(self.pack_dir / "pack.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.sample_rate = self.meta["sample_rate"]
+        self.dtype = np.dtype(self.meta["dtype"])
+        self.samples = self.meta["items"]
+        self.crop = int(crop_seconds * self.sample_rate) if crop_seconds else None
+        self.crop_mode = crop_mode
+
+        self._index = [
+            np.load(self.pack_dir / f"shard_{i:05d}.idx.npy")
+            for i in range(len(self.meta["shards"]))
+        ]
+        self._maps = {}
+
+        print(f"✅ Sharded dataset ready | Samples: {len(self.samples)} | Shards: {len(self._index)}")
+
+    def __len__(self):
+        return len(self.samples)
+
+    def _shard(self, shard: int) -> np.ndarray:
+        mm = self._maps.get(shard)
+        if mm is None:
+            mm = np.memmap(
+                self.pack_dir / self.meta["shards"][shard]["file"],
+                dtype=self.dtype,
+                mode="r",
+            )
+            self._maps[shard] = mm
+        return mm
+
+    def __getstate__(self):
+        # memmaps are re-opened in each worker, never pickled
+        state = dict(self.__dict__)
+        state["_maps"] = {}
+        return state
+
+    @property
+    def lengths(self):
+        """
+        Samples per item after cropping, straight from the offset index.
+        """
+        lengths = [int(self._index[s["shard"]][s["row"], 1]) for s in self.samples]
+        if self.crop:
+            lengths = [min(n, self.crop) for n in lengths]
+        return lengths
+
+    def window(self, idx, rng=random) -> np.ndarray:
+        """
+        Zero-copy memmap view of the (cropped) sample.
+        """
+        item = self.samples[idx]
+        offset, length = self._index[item["shard"]][item["row"]]
+        if self.crop and length > self.crop:
+            offset += _crop_start(int(length), self.crop, self.crop_mode, rng)
+            length = self.crop
+        return self._shard(item["shard"])[offset:offset + length]
+
+    def _item(self, idx, rng=random):
+        from scripts.pack_audio_shards import decode
+
+        item = self.samples[idx]
+        return {
+            "audio": torch.from_numpy(decode(self.window(idx, rng))),
+            "speaker_idx": item["speaker_idx"],
+            "age": item["age"],
+            "path": item["path"]
+        }
+
+    def __getitem__(self, idx):
+        return self._item(idx)
+
+
+class ShardedAudioIterable(IterableDataset):
+    """
+    Iterable view of a ShardedAudioDataset for multi-worker loading.
+
+    Every worker draws the same global permutation of sample indices,
+    seeded by (seed, epoch), and serves its `[worker::num_workers]`
+    slice. Work is split evenly however few (512 MB) shards the pack
+    has, batches mix speakers across the whole pack, each epoch is
+    reproducible regardless of worker timing, and no sample is served
+    twice. Reads are random-access into the memmaps; the OS page cache
+    absorbs repeats.
+    """
+
+    def __init__(self, dataset: ShardedAudioDataset, shuffle: bool = True, seed: int = 0):
+        self.dataset = dataset
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __iter__(self):
+        info = get_worker_info()
+        worker, workers = (info.id, info.num_workers) if info is not None else (0, 1)
+
+        order = list(range(len(self.dataset)))
+        if self.shuffle:
+            random.Random(f"{self.seed}:{self.epoch}").shuffle(order)
+
+        # crop offsets: own stream per worker, still reproducible
+        rng = random.Random(f"{self.seed}:{self.epoch}:{worker}")
+        for idx in order[worker::workers]:
+            yield self.dataset._item(idx, rng)
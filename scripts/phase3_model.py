@@ -2,35 +2,64 @@
 
 import torch
 import torch.nn as nn
-from transformers import Wav2Vec2Model
+from transformers import Wav2Vec2Config, Wav2Vec2Model
+
+from scripts.backbone_feature_cache import masked_mean_pool
 
 MODEL_NAME = "facebook/wav2vec2-base-960h"
 
 
+def _embedding_head(hidden: int) -> nn.Sequential:
+    return nn.Sequential(
+        nn.Linear(hidden, 256),
+        nn.ReLU(),
+        nn.LayerNorm(256),
+        nn.Linear(256, 128)
+    )
+
+
+def _load_backbone(load_backbone: bool):
+    """
+    Frozen wav2vec2 backbone, or None when training on cached features
+    (scripts/backbone_feature_cache.py); `hidden` comes from the config
+    either way.
+    """
+    if not load_backbone:
+        return None, Wav2Vec2Config.from_pretrained(MODEL_NAME).hidden_size
+
+    backbone = Wav2Vec2Model.from_pretrained(MODEL_NAME)
+    for p in backbone.parameters():
+        p.requires_grad = False
+    return backbone, backbone.config.hidden_size
+
+
+def _pool(backbone, audio, lengths=None, attention_mask=None):
+    if lengths is not None:
+        # padded batch: average real frames only. Exact only for backbones
+        # that mask padding; wav2vec2-base still attends over it, so its
+        # trainer batches equal-length crops (exact_lengths sampler)
+        return masked_mean_pool(backbone, audio, lengths, attention_mask).contiguous()
+
+    outputs = backbone(audio, return_dict=True)
+    hidden = outputs.last_hidden_state           # (B, T, H)
+
+    pooled = hidden.mean(dim=1)
+    return pooled.contiguous()                   # 🔥 MPS-safe
+
+
 class AgeSpeakerModel(nn.Module):
     """
     Speaker-aware embedding model (Phase 3)
     """
 
-    def __init__(self, num_speakers: int, device="cpu"):
+    def __init__(self, num_speakers: int, device="cpu", load_backbone: bool = True):
         super().__init__()
 
-        # -------- Backbone --------
-        self.backbone = Wav2Vec2Model.from_pretrained(MODEL_NAME)
-
-        # Freeze backbone
-        for p in self.backbone.parameters():
-            p.requires_grad = False
-
-        hidden = self.backbone.config.hidden_size  # 768
+        # -------- Backbone (frozen) --------
+        self.backbone, hidden = _load_backbone(load_backbone)  # 768
 
         # -------- Embedding Head (DEFINED HERE ✅) --------
-        self.embedding_head = nn.Sequential(
-            nn.Linear(hidden, 256),
-            nn.ReLU(),
-            nn.LayerNorm(256),
-            nn.Linear(256, 128)
-        )
+        self.embedding_head = _embedding_head(hidden)
 
         # -------- Speaker Classifier --------
         self.classifier = nn.Linear(128, num_speakers)
@@ -38,17 +67,37 @@ class AgeSpeakerModel(nn.Module):
         self.device = device
         self.to(device)
 
-    def forward(self, audio):
+    def forward_features(self, pooled):
         """
-        audio: (B, T)
+        pooled: (B, H) cached backbone features
         """
-        outputs = self.backbone(audio, return_dict=True)
-        hidden = outputs.last_hidden_state           # (B, T, H)
-
-        pooled = hidden.mean(dim=1)
-        pooled = pooled.contiguous()                 # 🔥 MPS-safe
-
         emb = self.embedding_head(pooled)            # (B, 128)
         logits = self.classifier(emb)                # (B, num_speakers)
+        return emb, logits
+
+    def forward(self, audio, lengths=None, attention_mask=None):
+        """
+        audio: (B, T); lengths / attention_mask from voice_collate_fn
+        """
+        return self.forward_features(_pool(self.backbone, audio, lengths, attention_mask))
+
+
+class AgeEmbeddingModel(nn.Module):
+    """
+    Age embedding model (frozen wav2vec2 + trainable 128-d head)
+    """
+
+    def __init__(self, device="cpu", load_backbone: bool = True):
+        super().__init__()
+
+        self.backbone, hidden = _load_backbone(load_backbone)
+        self.embedding_head = _embedding_head(hidden)
+
+        self.device = device
+        self.to(device)
+
+    def forward_features(self, pooled):
+        return self.embedding_head(pooled)           # (B, 128)
 
-        return emb, logits
\ No newline at end of file
+    def forward(self, audio, lengths=None, attention_mask=None):
+        return self.forward_features(_pool(self.backbone, audio, lengths, attention_mask))
@@ -0,0 +1,94 @@
+# scripts/phase3_sampler.py
+
+import random
+from typing import Iterator, List, Optional, Sequence
+
+from torch.utils.data import Sampler
+
+
+class LengthBucketBatchSampler(Sampler):
+    """
+    Batches clips of similar length so padding stays small.
+
+    Indices are shuffled, cut into pools of `batch_size * bucket_factor`,
+    each pool is sorted by length and split into batches, and the
+    batches are shuffled again. With `max_frames`, a batch is also
+    closed once (longest clip x count) would exceed that padded-frame
+    budget, so short clips get large batches and long ones small.
+
+    With `exact_lengths`, a batch only ever holds clips of one length
+    (no padding at all) - needed for backbones that cannot mask padding,
+    such as wav2vec2-base. Fixed-length crops keep those batches full.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        max_frames: Optional[int] = None,
+        bucket_factor: int = 50,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 0,
+        exact_lengths: bool = False,
+    ):
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.max_frames = max_frames
+        self.bucket_factor = bucket_factor
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.exact_lengths = exact_lengths
+        self.epoch = 0          # epoch the next pass will use
+        self._current = 0       # epoch len() reports on: the running pass, else the next
+        self._cache = None      # (epoch, batches)
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+        self._current = epoch
+
+    def _split(self, pool: List[int]) -> List[List[int]]:
+        batches, batch, longest = [], [], 0
+        for i in pool:
+            n = max(longest, self.lengths[i])
+            full = len(batch) >= self.batch_size
+            over = self.max_frames is not None and batch and n * (len(batch) + 1) > self.max_frames
+            mixed = self.exact_lengths and batch and self.lengths[i] != self.lengths[batch[0]]
+            if full or over or mixed:
+                batches.append(batch)
+                batch, n = [], self.lengths[i]
+            batch.append(i)
+            longest = n
+        if batch and not (self.drop_last and len(batch) < self.batch_size):
+            batches.append(batch)
+        return batches
+
+    def _batches(self, epoch: int) -> List[List[int]]:
+        if self._cache is not None and self._cache[0] == epoch:
+            return self._cache[1]
+
+        rng = random.Random(self.seed + epoch)
+        order = list(range(len(self.lengths)))
+        if self.shuffle:
+            rng.shuffle(order)
+
+        pool_size = self.batch_size * self.bucket_factor
+        batches = []
+        for start in range(0, len(order), pool_size):
+            pool = sorted(order[start:start + pool_size], key=lambda i: self.lengths[i])
+            batches.extend(self._split(pool))
+
+        if self.shuffle:
+            rng.shuffle(batches)
+        self._cache = (epoch, batches)
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        epoch = self._current = self.epoch
+        self.epoch += 1
+        yield from self._batches(epoch)
+        self._current = self.epoch
+
+    def __len__(self) -> int:
+        return len(self._batches(self._current))
@@ -1,11 +1,15 @@
 # scripts/playback_service.py
 
 from pathlib import Path
-import uuid
+
+import soundfile as sf
 
 from scripts.hybrid_playback_decider import decide_playback_mode
 from scripts.synthesize_from_embedding import synthesize_from_embedding
 from scripts.age_text_shaper import shape_text_for_age
+from scripts.audio_cache import get_cache_index, make_cache_key
+from scripts.streaming_synthesis import stream_file, stream_synthesis
+from scripts.synthesis_engine import SAMPLE_RATE
 
 # --------------------------------------------------
 # OUTPUT DIRECTORY
@@ -15,11 +19,14 @@ OUTPUT_DIR = Path("outputs")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def play_voice(user_id: str, target_age: int, text: str) -> dict:
+def play_voice(user_id: str, target_age: int, text: str, job_id: str = None) -> dict:
     """
     Production-safe playback:
     - NO waveform DSP
     - ONLY embedding aging + neural TTS
+
+    `job_id` makes the output file unique per job, so concurrent
+    requests for the same user/age never overwrite each other.
     """
 
     decision = decide_playback_mode(user_id, target_age)
@@ -55,8 +62,10 @@ def play_voice(user_id: str, target_age: int, text: str) -> dict:
                 "reason": "Base version missing for aging"
             }
 
-        uid = uuid.uuid4().hex[:8]
-        out_path = OUTPUT_DIR / f"{user_id}_aged_{target_age}.wav"
+        if job_id:
+            out_path = OUTPUT_DIR / f"{user_id}_aged_{target_age}_{job_id}.wav"
+        else:
+            out_path = OUTPUT_DIR / f"{user_id}_aged_{target_age}.wav"
 
         # ✔ text shaping (safe)
         shaped_text = shape_text_for_age(text, target_age)
@@ -83,4 +92,81 @@ def play_voice(user_id: str, target_age: int, text: str) -> dict:
     return {
         "mode": "NONE",
         "reason": decision.get("reason", "No voice available")
-    }
\ No newline at end of file
+    }
+
+
+def stream_voice(user_id: str, target_age: int, text: str) -> dict:
+    """
+    Streaming variant of play_voice().
+
+    Same decision logic, but returns immediately with a `chunks`
+    generator of float32 PCM blocks. AGED audio is synthesized one
+    sentence at a time, so the first chunk arrives after the first
+    sentence is rendered; the full utterance lands in the audio cache
+    (`audio_path`) once the generator is exhausted.
+    """
+
+    decision = decide_playback_mode(user_id, target_age)
+    mode = decision.get("mode")
+
+    if mode == "RECORDED":
+        version = decision.get("version") or decision.get("base_version")
+
+        audio_path = (version or {}).get("audio_path")
+        if not audio_path or not Path(audio_path).exists():
+            # PREDICTED versions carry no audio; files can be deleted
+            return {
+                "mode": "ERROR",
+                "reason": "Recorded version missing"
+            }
+
+        try:
+            info = sf.info(audio_path)
+        except sf.LibsndfileError as e:
+            return {
+                "mode": "ERROR",
+                "reason": f"Recorded audio unreadable: {e}"
+            }
+
+        return {
+            "mode": "RECORDED",
+            "audio_path": audio_path,
+            "sample_rate": info.samplerate,
+            "chunks": stream_file(audio_path, block_frames=info.samplerate),
+            "reason": "Using real recorded voice"
+        }
+
+    if mode == "AGED":
+        base_version = decision.get("base_version")
+
+        if not base_version or "audio_path" not in base_version:
+            return {
+                "mode": "ERROR",
+                "reason": "Base version missing for aging"
+            }
+
+        shaped_text = shape_text_for_age(text, target_age)
+        cache_key = make_cache_key(
+            shaped_text,
+            base_version["audio_path"],
+            decision["embedding"],
+        )
+
+        return {
+            "mode": "AGED",
+            "audio_path": str(get_cache_index().path_for(cache_key)),
+            "sample_rate": SAMPLE_RATE,
+            "chunks": stream_synthesis(
+                shaped_text,
+                base_version["audio_path"],
+                cache_key=cache_key,
+            ),
+            "alpha": decision.get("alpha"),
+            "relation": decision.get("relation"),
+            "reason": "Age-evolved voice (neural, streamed)"
+        }
+
+    return {
+        "mode": "NONE",
+        "reason": decision.get("reason", "No voice available")
+    }
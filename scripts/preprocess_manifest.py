@@ -1,38 +1,116 @@
 # scripts/preprocess_manifest.py
 import csv
+import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-import subprocess
-import shlex
 import argparse
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+CHUNK_SIZE = 16   # rows handed to a worker at a time
+
+
+def _init_worker():
+    # librosa / webrtcvad are imported once per worker, not per file
+    import src.preprocess  # noqa: F401
+
 
 def run_preprocess(input_path, out_dir="preprocessed", target_sr=16000, min_segment_s=0.5):
-    # Calls your existing preprocess script (keeps logic in one place)
-    in_full = str(PROJECT_ROOT / input_path)
-    out_dir_full = str(PROJECT_ROOT / out_dir)
-    cmd = f"python {PROJECT_ROOT/'src'/'preprocess.py'} --input {shlex.quote(in_full)} --out_dir {shlex.quote(out_dir_full)} --target_sr {target_sr} --min_segment_s {min_segment_s}"
+    """
+    In-process preprocessing of one file with src/preprocess.py
+    (read_wav -> run_vad -> rms_normalize). Returns the output path
+    relative to the project root, or None on failure.
+    """
+    import soundfile as sf
+    from src.preprocess import read_wav, run_vad, rms_normalize
+
+    in_full = PROJECT_ROOT / input_path
+    out_dir_full = PROJECT_ROOT / out_dir
+    stem = Path(input_path).stem
+    out_path = Path(out_dir) / f"{stem}_preproc.wav"
+
     try:
-        print("Running:", cmd)
-        out = subprocess.check_output(shlex.split(cmd), stderr=subprocess.STDOUT, text=True)
-        print(out)
-    except subprocess.CalledProcessError as e:
+        audio, sr = read_wav(str(in_full), target_sr)
+        voiced = run_vad(audio, sr)
+        if len(voiced) < int(min_segment_s * sr):
+            print("Preprocess failed for", input_path, "(voiced audio too short)")
+            return None
+        voiced = rms_normalize(voiced)
+
+        out_dir_full.mkdir(parents=True, exist_ok=True)
+        tmp = out_dir_full / f"{stem}_preproc.{os.getpid()}.tmp.wav"
+        sf.write(str(tmp), voiced, sr)
+        os.replace(tmp, PROJECT_ROOT / out_path)
+    except Exception as e:
         print("Preprocess failed for", input_path)
-        print("Output:", e.output)
+        print("Error:", e)
         return None
 
-    # expected output file name (same stem + _preproc.wav in out_dir)
-    stem = Path(input_path).stem
-    out_path = Path(out_dir) / f"{stem}_preproc.wav"
     return str(out_path)
 
-def preprocess_manifest(manifest_in="data/manifest.csv", manifest_out="data/manifest_preproc.csv"):
+
+def _job(args):
+    idx, file_path, out_dir, target_sr, min_segment_s = args
+    return idx, run_preprocess(file_path, out_dir, target_sr, min_segment_s)
+
+
+def _load_checkpoint(path: Path, settings: dict) -> dict:
+    """
+    row index -> (file_path, preproc_path) for rows finished by an
+    earlier (possibly interrupted) run. The first line records the run
+    settings; a checkpoint written with other settings is discarded.
+    Failed rows, and rows whose output file is gone, are redone.
+    """
+    done = {}
+    if not path.exists():
+        return done
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            if "settings" in rec:
+                if rec["settings"] != settings:
+                    print("Checkpoint settings changed, starting over:", path)
+                    return {}
+                continue
+            if rec["preproc_path"] and (PROJECT_ROOT / rec["preproc_path"]).exists():
+                done[rec["row"]] = (rec["file_path"], rec["preproc_path"])
+    return done
+
+
+def preprocess_manifest(
+    manifest_in="data/manifest.csv",
+    manifest_out="data/manifest_preproc.csv",
+    workers=None,
+    fresh=False,
+    out_dir="preprocessed",
+    target_sr=16000,
+    min_segment_s=0.25,
+):
+    """
+    Preprocesses every manifest row in a process pool.
+
+    Finished rows are appended to <manifest_out>.progress as they
+    complete, so a re-run with the same settings skips them; the output
+    manifest is streamed in input order to a temp file and renamed into
+    place at the end, after which the checkpoint is removed.
+    """
     manifest_in = PROJECT_ROOT / manifest_in
     if not manifest_in.exists():
         print("Manifest not found:", manifest_in)
         return 2
 
+    manifest_out = PROJECT_ROOT / manifest_out
+    checkpoint = manifest_out.with_name(manifest_out.name + ".progress")
+    settings = {"out_dir": str(out_dir), "target_sr": target_sr, "min_segment_s": min_segment_s}
+    done = {} if fresh else _load_checkpoint(checkpoint, settings)
+
     rows = []
     with open(manifest_in, newline='', encoding='utf-8') as fh:
         reader = csv.DictReader(fh)
@@ -42,22 +120,50 @@ def preprocess_manifest(manifest_in="data/manifest.csv", manifest_out="data/mani
             if not file_path:
                 print("Skipping row, missing file path:", r)
                 continue
-    
-            preproc = run_preprocess(file_path, out_dir="preprocessed", target_sr=16000, min_segment_s=0.25)
-            if preproc is None:
-                r["preproc_path"] = ""
-            else:
-                r["preproc_path"] = preproc
-            rows.append(r)
+            rows.append((len(rows), file_path, r))
 
-    # write new manifest
-    manifest_out = PROJECT_ROOT / manifest_out
-    with open(manifest_out, "w", newline='', encoding='utf-8') as fh:
+    # resume only rows whose input is unchanged
+    todo = [
+        (idx, file_path, out_dir, target_sr, min_segment_s)
+        for idx, file_path, _ in rows
+        if done.get(idx, (None,))[0] != file_path
+    ]
+    print(f"Rows: {len(rows)} | already done: {len(rows) - len(todo)} | to process: {len(todo)}")
+
+    tmp_out = manifest_out.with_name(manifest_out.name + ".tmp")
+    manifest_out.parent.mkdir(parents=True, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+            open(checkpoint, "a" if done else "w", encoding="utf-8") as ckpt, \
+            open(tmp_out, "w", newline='', encoding='utf-8') as fh:
+
+        if not done:
+            ckpt.write(json.dumps({"settings": settings}) + "\n")
         writer = csv.DictWriter(fh, fieldnames=fieldnames)
         writer.writeheader()
-        for r in rows:
+
+        results = pool.map(_job, todo, chunksize=CHUNK_SIZE)
+        finished = 0
+
+        for idx, file_path, r in rows:
+            cached = done.get(idx)
+            if cached is not None and cached[0] == file_path:
+                preproc = cached[1]
+            else:
+                res_idx, preproc = next(results)
+                assert res_idx == idx   # map() yields in submission order
+                preproc = preproc or ""
+                ckpt.write(json.dumps({"row": idx, "file_path": file_path, "preproc_path": preproc}) + "\n")
+                ckpt.flush()
+                finished += 1
+                if finished % 100 == 0:
+                    print(f"Preprocessed {finished}/{len(todo)}")
+
+            r["preproc_path"] = preproc
             writer.writerow(r)
 
+    os.replace(tmp_out, manifest_out)
+    checkpoint.unlink()
     print("Wrote preprocessed manifest:", manifest_out)
     return 0
 
@@ -65,5 +171,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--in", dest="manifest_in", default="data/manifest.csv")
     parser.add_argument("--out", dest="manifest_out", default="data/manifest_preproc.csv")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore the checkpoint and redo every row")
     args = parser.parse_args()
-    sys.exit(preprocess_manifest(manifest_in=args.manifest_in, manifest_out=args.manifest_out))
\ No newline at end of file
+    sys.exit(preprocess_manifest(
+        manifest_in=args.manifest_in,
+        manifest_out=args.manifest_out,
+        workers=args.workers,
+        fresh=args.fresh,
+    ))
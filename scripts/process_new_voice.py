@@ -4,7 +4,7 @@ from pathlib import Path
 from datetime import datetime, timezone
 import numpy as np
 
-from scripts.audio_preprocess import normalize_audio   # 🔑 CRITICAL
+from scripts.audio_preprocess import load_clip   # 🔑 CRITICAL
 from scripts.audio_quality import audio_quality_gate
 from scripts.embed_ecapa import extract_embedding
 from scripts.speaker_verification import speaker_verification_gate
@@ -13,6 +13,8 @@ from scripts.confidence_engine import compute_confidence
 from scripts.version_decision import decide_voice_version
 from scripts.user_registry import UserRegistry
 from scripts.audio_utils import get_audio_duration
+from scripts.embedding_store import EmbeddingStore, load_reference_matrix
+from scripts.speaker_latents import schedule_latents
 
 
 # ------------------ CONSTANTS ------------------
@@ -41,8 +43,10 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
     # ====================================================
     # 🔊 AUDIO NORMALIZATION (ABSOLUTELY REQUIRED)
     # ====================================================
+    # Decoded ONCE in-process; every gate below reads this buffer.
+    # Header metadata comes from the original upload.
     try:
-        clean_audio = normalize_audio(audio_path)
+        clip = load_clip(audio_path)
     except Exception as e:
         return {
             "accepted": False,
@@ -51,7 +55,7 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
         }
 
     # ---------------- Duration ----------------
-    duration = get_audio_duration(str(clean_audio))
+    duration = get_audio_duration(clip)
     if duration < MIN_DURATION_SEC:
         return {
             "accepted": False,
@@ -60,11 +64,11 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
         }
 
     # ---------------- Audio Quality (SOFT) ----------------
-    quality = audio_quality_gate(str(clean_audio), dev_mode=True)
+    quality = audio_quality_gate(clip, dev_mode=True)
     soft_quality_fail = not quality["accepted"]
 
     # ---------------- ECAPA Embedding ----------------
-    embedding = extract_embedding(clean_audio)
+    embedding = extract_embedding(clip)
     embedding = embedding / np.linalg.norm(embedding)
 
     history_versions = user.get_versions()
@@ -75,19 +79,17 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
     if not history_versions:
         version_id = str(int(datetime.now(timezone.utc).timestamp()))
 
-        emb_dir = PROJECT_ROOT / "versions" / "embeddings"
-        emb_dir.mkdir(parents=True, exist_ok=True)
-
-        emb_path = emb_dir / f"{user_id}_{version_id}.npy"
-        np.save(emb_path, embedding)
+        emb_ref = EmbeddingStore(user_id).append(version_id, embedding)
 
         user.add_voice_version(
             version_id=version_id,
-            embedding_path=str(emb_path.relative_to(PROJECT_ROOT)),
+            embedding_path=emb_ref,
             audio_path=str(audio_path),   # 🔒 store ORIGINAL audio
             confidence=1.0,
             voice_type="RECORDED",
+            embedding=embedding,
         )
+        schedule_latents(str(audio_path))
 
         return {
             "accepted": True,
@@ -103,15 +105,8 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
     # ====================================================
     # 🔍 SPEAKER VERIFICATION (ECAPA)
     # ====================================================
-    reference_embs = []
-    for v in history_versions:
-        p = v.get("embedding_path")
-        if p:
-            full = PROJECT_ROOT / p
-            if full.exists():
-                e = np.load(full).astype("float32")
-                e = e / np.linalg.norm(e)
-                reference_embs.append(e)
+    # one zero-copy view over the packed per-user matrix
+    reference_embs = load_reference_matrix(user_id, history_versions)
 
     speaker = speaker_verification_gate(
         new_emb=embedding,
@@ -134,7 +129,7 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
         latest = user.get_latest_version()
         if latest and latest.get("audio_path"):
             fp_ref = extract_device_fingerprint(latest["audio_path"])
-            fp_new = extract_device_fingerprint(str(audio_path))
+            fp_new = extract_device_fingerprint(clip)
             device_score = device_match_score(fp_new, fp_ref)
     except Exception:
         pass
@@ -166,19 +161,17 @@ def process_new_voice(user_id: str, audio_path: str) -> dict:
     if decision["action"] == "CREATE_VERSION":
         version_id = str(int(datetime.now(timezone.utc).timestamp()))
 
-        emb_dir = PROJECT_ROOT / "versions" / "embeddings"
-        emb_dir.mkdir(parents=True, exist_ok=True)
-
-        emb_path = emb_dir / f"{user_id}_{version_id}.npy"
-        np.save(emb_path, embedding)
+        emb_ref = EmbeddingStore(user_id).append(version_id, embedding)
 
         user.add_voice_version(
             version_id=version_id,
-            embedding_path=str(emb_path.relative_to(PROJECT_ROOT)),
+            embedding_path=emb_ref,
             audio_path=str(audio_path),   # 🔒 ORIGINAL audio
             confidence=confidence,
             voice_type="RECORDED",
+            embedding=embedding,
         )
+        schedule_latents(str(audio_path))
 
     return {
         "accepted": True,
@@ -1,81 +1,224 @@
 # scripts/rate_limiter.py
 
+import math
+import sqlite3
+import threading
 import time
-import json
 from pathlib import Path
+from typing import Optional, Tuple
+
+from scripts.config_loader import CONFIG
+
+try:
+    import redis
+except ImportError:  # optional: only needed for backend: redis
+    redis = None
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 RUNTIME_DIR = PROJECT_ROOT / "runtime"
-RATE_LIMIT_FILE = RUNTIME_DIR / "rate_limits.json"
 
-# ------------------ CONFIG (PRODUCTION SAFE) ------------------
+# ------------------ CONFIG ------------------
+
+_RATE_CFG = CONFIG.get("rate_limit", {})
 
-MAX_REQUESTS = 5          # max synth requests
-WINDOW_SECONDS = 600      # 10 minutes
+MAX_REQUESTS = int(_RATE_CFG.get("max_requests", 5))       # bucket capacity
+WINDOW_SECONDS = float(_RATE_CFG.get("window_sec", 600))   # time to refill fully
+BACKEND = _RATE_CFG.get("backend", "sqlite")                # memory | sqlite | redis
+SQLITE_PATH = PROJECT_ROOT / _RATE_CFG.get("sqlite_path", "runtime/rate_limits.db")
+REDIS_URL = _RATE_CFG.get("redis_url", "redis://localhost:6379/0")
+REDIS_PREFIX = "voice:rl:"
 
-# -------------------------------------------------------------
 
+# ------------------ TOKEN BUCKET ------------------
 
-def _load_state() -> dict:
-    if not RATE_LIMIT_FILE.exists():
-        return {}
-    try:
-        with open(RATE_LIMIT_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+def _refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
 
 
-def _save_state(state: dict):
-    RUNTIME_DIR.mkdir(exist_ok=True)
-    with open(RATE_LIMIT_FILE, "w") as f:
-        json.dump(state, f, indent=2)
+class MemoryBucketBackend:
+    """
+    In-process buckets: one dict lookup per check. Limits are per
+    worker process.
+    """
 
+    def __init__(self):
+        self._buckets = {}     # key -> (tokens, updated)
+        self._lock = threading.Lock()
 
-def check_rate_limit(user_id: str) -> dict:
+    def take(self, key: str, capacity: float, rate: float, now: float, cost: float = 1.0) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            return allowed, tokens
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key      TEXT PRIMARY KEY,
+    tokens   REAL NOT NULL,
+    updated  REAL NOT NULL
+);
+"""
+
+
+class SqliteBucketBackend:
+    """
+    Buckets shared by every worker process on the host. Each check is
+    one row read + upsert inside a BEGIN IMMEDIATE transaction, so
+    concurrent workers cannot lose each other's updates.
     """
-    Enforces per-user rate limiting.
 
-    Returns:
-    {
-        allowed: bool,
-        remaining: int,
-        reset_in_sec: int
-    }
+    def __init__(self, db_path: Path = SQLITE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, capacity: float, rate: float, now: float, cost: float = 1.0) -> Tuple[bool, float]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row is not None else (capacity, now)
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed, tokens
+
+
+_REDIS_TAKE = """
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local tokens = tonumber(b[1]) or capacity
+local updated = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketBackend:
+    """
+    Buckets shared across hosts. The refill + take runs as one Lua
+    script, so it is atomic on the server. `client` may be any object
+    with a redis-py style eval() (e.g. a local fakeredis instance).
     """
 
-    now = int(time.time())
-    state = _load_state()
+    def __init__(self, client=None, url: str = REDIS_URL, prefix: str = REDIS_PREFIX):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("rate_limit.backend is 'redis' but the redis package is not installed")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
 
-    user = state.get(user_id, {
-        "window_start": now,
-        "count": 0
-    })
+    def take(self, key: str, capacity: float, rate: float, now: float, cost: float = 1.0) -> Tuple[bool, float]:
+        allowed, tokens = self.client.eval(
+            _REDIS_TAKE, 1, self.prefix + key, capacity, rate, now, cost
+        )
+        return bool(int(allowed)), float(tokens)
 
-    elapsed = now - user["window_start"]
 
-    # Reset window
-    if elapsed >= WINDOW_SECONDS:
-        user = {
-            "window_start": now,
-            "count": 0
-        }
+def make_backend(name: str = BACKEND):
+    if name == "memory":
+        return MemoryBucketBackend()
+    if name == "sqlite":
+        return SqliteBucketBackend()
+    if name == "redis":
+        return RedisBucketBackend()
+    raise ValueError(f"Unknown rate_limit backend: {name}")
+
 
-    # Reject if limit exceeded
-    if user["count"] >= MAX_REQUESTS:
+# ------------------ LIMITER ------------------
+
+class RateLimiter:
+    """
+    Token bucket: `max_calls` burst, refilled continuously so that
+    `max_calls` requests are allowed per `window_sec`.
+    """
+
+    def __init__(
+        self,
+        max_calls: int = MAX_REQUESTS,
+        window_sec: float = WINDOW_SECONDS,
+        backend=None,
+    ):
+        self.capacity = float(max_calls)
+        self.rate = max_calls / float(window_sec)
+        self.backend = backend if backend is not None else MemoryBucketBackend()
+
+    def check(self, key: str, cost: float = 1.0) -> dict:
+        allowed, tokens = self.backend.take(key, self.capacity, self.rate, time.time(), cost)
+
+        # allowed: time until the bucket is full again
+        # rejected: time until the next request would pass
+        missing = (self.capacity - tokens) if allowed else (cost - tokens)
         return {
-            "allowed": False,
-            "remaining": 0,
-            "reset_in_sec": max(0, WINDOW_SECONDS - elapsed)
+            "allowed": allowed,
+            "remaining": int(tokens),
+            "reset_in_sec": max(0, math.ceil(missing / self.rate)),
         }
 
-    # Accept request
-    user["count"] += 1
-    state[user_id] = user
-    _save_state(state)
+    def allow(self, key: str) -> bool:
+        return self.check(key)["allowed"]
+
+
+_LIMITER: Optional[RateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _LIMITER
+    if _LIMITER is None:
+        with _LIMITER_LOCK:
+            if _LIMITER is None:
+                _LIMITER = RateLimiter(backend=make_backend())
+    return _LIMITER
+
+
+def check_rate_limit(user_id: str) -> dict:
+    """
+    Enforces per-user rate limiting.
 
-    return {
-        "allowed": True,
-        "remaining": MAX_REQUESTS - user["count"],
-        "reset_in_sec": max(0, WINDOW_SECONDS - elapsed)
-    }
\ No newline at end of file
+    Returns:
+    {
+        allowed: bool,
+        remaining: int,
+        reset_in_sec: int
+    }
+    """
+    return get_rate_limiter().check(user_id)
@@ -2,6 +2,7 @@ from pathlib import Path
 import numpy as np
 from datetime import datetime, timezone
 from scripts.user_registry import UserRegistry
+from scripts.embedding_store import EmbeddingStore
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
@@ -15,15 +16,11 @@ def save_predicted_version(
     user = UserRegistry(user_id)
 
     version_id = str(int(datetime.now(timezone.utc).timestamp()))
-    emb_dir = PROJECT_ROOT / "versions" / "embeddings"
-    emb_dir.mkdir(parents=True, exist_ok=True)
-
-    emb_path = emb_dir / f"{user_id}_predicted_{target_age}_{version_id}.npy"
-    np.save(emb_path, aged_embedding)
+    emb_ref = EmbeddingStore(user_id).append(version_id, aged_embedding)
 
     user.add_voice_version(
         version_id=version_id,
-        embedding_path=str(emb_path.relative_to(PROJECT_ROOT)),
+        embedding_path=emb_ref,
         audio_path=None,
         confidence=confidence,
         voice_type="PREDICTED",
@@ -32,6 +29,6 @@ def save_predicted_version(
 
     return {
         "version_id": version_id,
-        "embedding_path": str(emb_path),
+        "embedding_path": emb_ref,
         "age": target_age
     }
\ No newline at end of file
@@ -0,0 +1,144 @@
+# scripts/single_flight.py
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: in-process coalescing only
+    fcntl = None
+
+# ------------------ CONSTANTS ------------------
+
+LOCK_DIR = Path("cache/audio/locks")
+LOCK_TTL_SEC = 600          # unused this long -> lock file may be swept
+SWEEP_INTERVAL_SEC = 300
+
+
+class SingleFlight:
+    """
+    Per-key in-flight deduplication.
+
+    The first caller for a key becomes the leader and does the work;
+    identical concurrent callers block until it finishes and then
+    re-check for the leader's result instead of repeating the work.
+    Threads coordinate on a per-key lock; worker processes on an
+    flock()'d lock file under LOCK_DIR.
+    """
+
+    def __init__(self, lock_dir: Path = LOCK_DIR):
+        self.lock_dir = Path(lock_dir)
+        self._guard = threading.Lock()
+        self._locks = {}     # key -> [threading.Lock, refcount]
+        self._last_sweep = 0.0
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def _release_ref(self, key: str):
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del self._locks[key]
+
+    def _lock_path(self, key: str) -> Path:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.lock_dir / f"{name}.lock"
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        Held by exactly one thread across all processes sharing LOCK_DIR.
+        """
+        tlock = self._thread_lock(key)
+        try:
+            with tlock:
+                if fcntl is None:
+                    yield
+                    return
+
+                self.lock_dir.mkdir(parents=True, exist_ok=True)
+                with open(self._lock_path(key), "a") as lf:
+                    fcntl.flock(lf, fcntl.LOCK_EX)
+                    os.utime(lf.fileno())   # mtime = last use, for sweep()
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lf, fcntl.LOCK_UN)
+        finally:
+            self._release_ref(key)
+
+    def sweep(self, max_age: float = LOCK_TTL_SEC) -> int:
+        """
+        Deletes lock files unused for `max_age` seconds that nobody holds.
+        Lock files are created per key and would otherwise pile up.
+        A process that opened a file just before it is removed can end up
+        leading alongside a new one; that only costs a duplicate render
+        (cache writes are atomic), never a wrong result.
+        """
+        if fcntl is None or not self.lock_dir.exists():
+            return 0
+
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.lock_dir.glob("*.lock"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                with open(path, "a") as lf:
+                    try:
+                        fcntl.flock(lf, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue        # in use right now
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def maybe_sweep(self):
+        """
+        sweep() at most once per SWEEP_INTERVAL_SEC in this process.
+        """
+        now = time.time()
+        with self._guard:
+            if now - self._last_sweep < SWEEP_INTERVAL_SEC:
+                return
+            self._last_sweep = now
+        self.sweep()
+
+    def do(self, key: str, fn: Callable, recheck: Optional[Callable] = None):
+        """
+        Runs `fn()` once per key at a time. After acquiring the lock,
+        `recheck()` is consulted first; a non-None result means another
+        caller already produced it and `fn` is skipped.
+        """
+        with self.lock(key):
+            if recheck is not None:
+                result = recheck()
+                if result is not None:
+                    return result
+            return fn()
+
+
+_FLIGHT: Optional[SingleFlight] = None
+_FLIGHT_LOCK = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _FLIGHT
+    if _FLIGHT is None:
+        with _FLIGHT_LOCK:
+            if _FLIGHT is None:
+                _FLIGHT = SingleFlight()
+    return _FLIGHT
@@ -2,6 +2,8 @@
 
 from typing import List, Dict
 
+from scripts.age_index import age_index_for
+
 
 def select_best_version(*, versions: List[Dict], target_age: int) -> Dict:
     """
@@ -25,21 +27,9 @@ def select_best_version(*, versions: List[Dict], target_age: int) -> Dict:
             "reason": "no_recorded_versions"
         }
 
-    best = None
-    best_gap = float("inf")
-
-    for v in versions:
-        age = v.get("age_at_recording")
-
-        # Skip versions without age info
-        if age is None:
-            continue
-
-        gap = abs(age - target_age)
-
-        if gap < best_gap:
-            best_gap = gap
-            best = v
+    # O(log n) bisect over the cached age index (versions without
+    # age info are skipped)
+    best, best_gap = age_index_for(versions).nearest(target_age)
 
     # ✅ Rule: within 5 years → use recorded voice
     if best and best_gap <= 5:
@@ -53,5 +43,5 @@ def select_best_version(*, versions: List[Dict], target_age: int) -> Dict:
     return {
         "mode": "GENERATED",
         "reason": "no_close_real_voice",
-        "closest_gap": best_gap if best else None
+        "closest_gap": best_gap
     }
\ No newline at end of file
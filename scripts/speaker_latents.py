@@ -0,0 +1,186 @@
+# scripts/speaker_latents.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from scripts.config_loader import CONFIG
+
+# ------------------ CONSTANTS ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+LATENTS_DIR = PROJECT_ROOT / "versions" / "latents"
+
+PRECOMPUTE_ON_VERSION = CONFIG.get("synthesis", {}).get("precompute_latents", False)
+MEMORY_SLOTS = 32
+
+# (path, mtime_ns, size) -> sha256
+_HASHES = {}
+# (audio_hash, model_name) -> (gpt_cond_latent, speaker_embedding)
+_MEMO = OrderedDict()
+_LOCK = threading.Lock()
+
+
+# ------------------ KEYS ------------------
+
+def audio_content_hash(audio_path: str) -> str:
+    """
+    sha256 of the reference audio bytes (memoized per path/mtime/size).
+    """
+    st = os.stat(audio_path)
+    key = (str(Path(audio_path).resolve()), st.st_mtime_ns, st.st_size)
+
+    with _LOCK:
+        if key in _HASHES:
+            return _HASHES[key]
+
+    h = hashlib.sha256()
+    with open(audio_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    digest = h.hexdigest()
+
+    with _LOCK:
+        _HASHES[key] = digest
+    return digest
+
+
+def latents_path(audio_hash: str, model_name: str) -> Path:
+    model_slug = model_name.replace("/", "--")
+    return LATENTS_DIR / model_slug / f"{audio_hash}.pt"
+
+
+# ------------------ LATENTS ------------------
+
+def _conditioning_kwargs(model) -> dict:
+    """
+    Reference-conditioning settings tts.tts() uses (XTTS full_inference),
+    so cached latents match the uncached path.
+    """
+    cfg = model.config
+    return {
+        "gpt_cond_len": cfg.gpt_cond_len,
+        "gpt_cond_chunk_len": cfg.gpt_cond_chunk_len,
+        "max_ref_length": cfg.max_ref_len,
+        "sound_norm_refs": cfg.sound_norm_refs,
+    }
+
+
+def _inference_kwargs(model) -> dict:
+    # sampling settings XTTS.synthesize() takes from the model config
+    cfg = model.config
+    return {
+        "temperature": cfg.temperature,
+        "length_penalty": cfg.length_penalty,
+        "repetition_penalty": cfg.repetition_penalty,
+        "top_k": cfg.top_k,
+        "top_p": cfg.top_p,
+    }
+
+
+def _xtts_model(tts):
+    model = getattr(getattr(tts, "synthesizer", None), "tts_model", None)
+    if model is None or not hasattr(model, "get_conditioning_latents"):
+        return None
+    return model
+
+
+def get_conditioning_latents(tts, speaker_wav: str, model_name: str):
+    """
+    Returns (gpt_cond_latent, speaker_embedding) for a reference clip.
+
+    Lookup order: in-process memo -> versions/latents/<model>/<sha>.pt ->
+    compute once with XTTS and persist. Returns None when the loaded
+    model does not expose conditioning latents.
+    """
+    model = _xtts_model(tts)
+    if model is None:
+        return None
+
+    import torch
+
+    key = (audio_content_hash(speaker_wav), model_name)
+    with _LOCK:
+        if key in _MEMO:
+            _MEMO.move_to_end(key)
+            return _MEMO[key]
+
+    cond = _conditioning_kwargs(model)
+    path = latents_path(*key)
+    saved = torch.load(path, map_location="cpu") if path.exists() else None
+
+    if saved is not None and saved.get("conditioning") == cond:
+        latents = (saved["gpt_cond_latent"], saved["speaker_embedding"])
+    else:
+        # missing, or written with different conditioning settings
+        gpt_cond_latent, speaker_embedding = model.get_conditioning_latents(
+            audio_path=[speaker_wav], **cond
+        )
+        latents = (gpt_cond_latent.cpu(), speaker_embedding.cpu())
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".pt.tmp")
+        torch.save({
+            "gpt_cond_latent": latents[0],
+            "speaker_embedding": latents[1],
+            "model_name": model_name,
+            "conditioning": cond,
+        }, tmp)
+        os.replace(tmp, path)
+
+    with _LOCK:
+        _MEMO[key] = latents
+        while len(_MEMO) > MEMORY_SLOTS:
+            _MEMO.popitem(last=False)
+
+    return latents
+
+
+def synthesize_with_latents(tts, text: str, speaker_wav: str, language: str, model_name: str):
+    """
+    XTTS inference from cached latents; falls back to tts.tts()
+    for models without a conditioning-latent API.
+    """
+    latents = get_conditioning_latents(tts, speaker_wav, model_name)
+    if latents is None:
+        return tts.tts(text=text, speaker_wav=speaker_wav, language=language)
+
+    model = _xtts_model(tts)
+    device = next(model.parameters()).device
+    gpt_cond_latent, speaker_embedding = (t.to(device) for t in latents)
+
+    # inference() asserts on XTTS's per-call token limit; split long text
+    # into sentences like tts.tts() does
+    out = model.inference(
+        text,
+        language,
+        gpt_cond_latent,
+        speaker_embedding,
+        enable_text_splitting=True,
+        **_inference_kwargs(model),
+    )
+    wav = out["wav"]
+    return wav.cpu().numpy() if hasattr(wav, "cpu") else wav
+
+
+def schedule_latents(audio_path: str):
+    """
+    Queues latent computation for a freshly created version on the
+    synthesis worker (fire-and-forget). No-op unless enabled in config.
+    """
+    if not PRECOMPUTE_ON_VERSION or not audio_path:
+        return None
+
+    from scripts.synthesis_engine import SynthesisBusy, get_synthesis_engine
+
+    engine = get_synthesis_engine()
+    try:
+        return engine.submit_call(
+            get_conditioning_latents,
+            speaker_wav=str(audio_path),
+            model_name=engine.model_name,
+        )
+    except SynthesisBusy:
+        return None  # computed lazily on first playback instead
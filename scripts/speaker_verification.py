@@ -2,6 +2,7 @@
 
 import numpy as np
 from scripts.user_registry import UserRegistry
+from scripts.embedding_store import load_reference_matrix
 
 # ------------------ CORE MATH ------------------
 
@@ -11,6 +12,64 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b))
 
 
+def l2_normalize_rows(m) -> np.ndarray:
+    """
+    (N x D) -> row-normalized float32 copy. Zero rows stay zero.
+    """
+    m = np.asarray(m, dtype=np.float32)
+    if m.ndim == 1:
+        m = m[None, :]
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+def batch_similarity(
+    probes,
+    references,
+    top_k: int = 1,
+    normalized: bool = False
+) -> dict:
+    """
+    Scores every probe against every reference with one GEMM.
+
+    probes:      (N x D)
+    references:  (M x D)
+    normalized:  skip re-normalization when rows are already unit length
+
+    Returns:
+    {
+        best_similarity: (N,)    best score per probe
+        best_index:      (N,)    reference row of the best score
+        topk_similarity: (N, k)  sorted descending
+        topk_index:      (N, k)
+    }
+    """
+    P = np.asarray(probes, dtype=np.float32) if normalized else l2_normalize_rows(probes)
+    R = np.asarray(references, dtype=np.float32) if normalized else l2_normalize_rows(references)
+    if P.ndim == 1:
+        P = P[None, :]
+
+    sims = P @ R.T                                  # (N x M)
+    k = max(1, min(top_k, sims.shape[1]))
+
+    if k == 1:
+        idx = np.argmax(sims, axis=1)[:, None]
+    else:
+        idx = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(sims, idx, axis=1), axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+
+    top = np.take_along_axis(sims, idx, axis=1)
+
+    return {
+        "best_similarity": top[:, 0],
+        "best_index": idx[:, 0],
+        "topk_similarity": top,
+        "topk_index": idx,
+    }
+
+
 # ------------------ LOW-LEVEL GATE ------------------
 
 def speaker_verification_gate(
@@ -29,12 +88,7 @@ def speaker_verification_gate(
             "reason": "First recording (no verification needed)"
         }
 
-    similarities = [
-        cosine_similarity(new_emb, ref)
-        for ref in reference_embs
-    ]
-
-    best_sim = max(similarities)
+    best_sim = float(batch_similarity(new_emb, reference_embs)["best_similarity"][0])
 
     if best_sim < threshold:
         return {
@@ -50,6 +104,38 @@ def speaker_verification_gate(
     }
 
 
+def speaker_verification_batch(
+    probe_embs,
+    reference_embs,
+    threshold: float = 0.80,
+    top_k: int = 1
+) -> dict:
+    """
+    Batched gate for backfills / re-verification jobs.
+    Same threshold semantics as speaker_verification_gate, per probe.
+    """
+
+    probes = l2_normalize_rows(probe_embs)
+
+    if len(reference_embs) == 0:
+        n = probes.shape[0]
+        return {
+            "accepted": np.ones(n, dtype=bool),
+            "best_similarity": np.full(n, np.nan, dtype=np.float32),
+            "best_index": np.full(n, -1, dtype=np.int64),
+        }
+
+    scores = batch_similarity(
+        probes,
+        l2_normalize_rows(reference_embs),
+        top_k=top_k,
+        normalized=True
+    )
+    scores["accepted"] = scores["best_similarity"] >= threshold
+
+    return scores
+
+
 # ------------------ PIPELINE WRAPPER ------------------
 
 def verify_speaker(user_id: str, embedding: np.ndarray) -> bool:
@@ -57,14 +143,8 @@ def verify_speaker(user_id: str, embedding: np.ndarray) -> bool:
     High-level speaker verification used by process_new_voice().
     """
 
-    registry = UserRegistry()
-    user = registry.get_user(user_id)
-
-    reference_embs = [
-        np.load(v["embedding_path"])
-        for v in user.get("voice_versions", [])
-        if v.get("embedding_path")
-    ]
+    user = UserRegistry(user_id)
+    reference_embs = load_reference_matrix(user_id, user.get_versions())
 
     result = speaker_verification_gate(
         new_emb=embedding,
@@ -80,11 +160,7 @@ def verify_speaker(user_id: str, audio_path: str) -> bool:
     from scripts.embed_single_audio import extract_embedding
 
     user = load_user(user_id)
-    reference_embs = [
-        np.load(v["embedding_path"])
-        for v in user.get("voice_versions", [])
-        if "embedding_path" in v
-    ]
+    reference_embs = load_reference_matrix(user_id, user.get("voice_versions", []))
 
     new_emb = extract_embedding(audio_path)
 
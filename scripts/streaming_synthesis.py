@@ -0,0 +1,167 @@
+# scripts/streaming_synthesis.py
+
+import asyncio
+import queue
+import re
+import threading
+from typing import AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from scripts.audio_cache import get_cache_index, write_cache_file
+from scripts.single_flight import get_single_flight
+from scripts.synthesis_engine import SAMPLE_RATE, get_synthesis_engine
+
+# ------------------ CONSTANTS ------------------
+
+MAX_SENTENCE_CHARS = 250          # XTTS quality drops on very long inputs
+FILE_BLOCK_FRAMES = SAMPLE_RATE   # 1 s blocks when streaming a cached file
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+# ------------------ TEXT ------------------
+
+def split_sentences(text: str, max_chars: int = MAX_SENTENCE_CHARS) -> List[str]:
+    """
+    Splits text on sentence punctuation; over-long sentences are
+    further split on commas/whitespace so no chunk exceeds max_chars.
+    """
+    sentences = []
+    for s in _SENTENCE_END.split(text.strip()):
+        s = s.strip()
+        if not s:
+            continue
+
+        while len(s) > max_chars:
+            cut = max(s.rfind(",", 0, max_chars), s.rfind(" ", 0, max_chars))
+            if cut <= 0:
+                cut = max_chars
+            sentences.append(s[:cut + 1].strip())
+            s = s[cut + 1:].strip()
+
+        if s:
+            sentences.append(s)
+
+    return sentences
+
+
+# ------------------ STREAMING ------------------
+
+def stream_file(path: str, block_frames: int = FILE_BLOCK_FRAMES) -> Iterator[np.ndarray]:
+    """
+    Yields an existing WAV as float32 blocks (cache hits, RECORDED mode).
+    """
+    with sf.SoundFile(str(path)) as f:
+        for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            yield block.mean(axis=1)
+
+
+def stream_synthesis(
+    text: str,
+    speaker_wav: str,
+    cache_key: Optional[str] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Synthesizes `text` sentence by sentence, yielding each float32 PCM
+    chunk (SAMPLE_RATE) as soon as it is rendered. The next sentence is
+    queued before the current one is yielded, so the worker never idles
+    while the consumer plays audio.
+
+    When `cache_key` is given a cache hit is streamed from disk, and on
+    a miss the full utterance is cached once the last chunk is produced.
+    """
+    if cache_key is None:
+        yield from _stream_sentences(text, speaker_wav, None)
+        return
+
+    cached_file = get_cache_index().lookup(cache_key)
+    if cached_file is not None:
+        yield from stream_file(cached_file)
+        return
+
+    # single-flight: the lock is held by a render thread, never across a
+    # yield, so a slow or abandoned consumer cannot stall identical
+    # requests. Whoever gets the lock first renders (and caches); later
+    # ones wait for it and are then served from the cached file.
+    chunks: "queue.Queue" = queue.Queue()
+    threading.Thread(
+        target=_render_locked,
+        args=(text, speaker_wav, cache_key, chunks),
+        daemon=True,
+    ).start()
+
+    while True:
+        kind, value = chunks.get()
+        if kind == "chunk":
+            yield value
+        elif kind == "file":
+            yield from stream_file(value)
+        elif kind == "error":
+            raise value
+        else:
+            return
+
+
+def _render_locked(text: str, speaker_wav: str, cache_key: str, out: "queue.Queue"):
+    """
+    Runs in its own thread: holds the single-flight lock only while
+    re-checking the cache or rendering + writing the cache file, and
+    hands chunks to the consumer through `out`.
+    """
+    try:
+        with get_single_flight().lock(cache_key):
+            cached_file = get_cache_index().lookup(cache_key, record=False)
+            if cached_file is not None:
+                out.put(("file", cached_file))
+                return
+
+            for chunk in _stream_sentences(text, speaker_wav, cache_key):
+                out.put(("chunk", chunk))
+    except Exception as e:
+        out.put(("error", e))
+    finally:
+        out.put(("done", None))
+
+
+def _stream_sentences(text: str, speaker_wav: str, cache_key: Optional[str]) -> Iterator[np.ndarray]:
+    sentences = split_sentences(text)
+    if not sentences:
+        return
+
+    engine = get_synthesis_engine()
+    chunks = []
+
+    pending = engine.submit(sentences[0], speaker_wav, block=True)
+    for i in range(len(sentences)):
+        current = pending
+        if i + 1 < len(sentences):
+            pending = engine.submit(sentences[i + 1], speaker_wav, block=True)
+
+        chunk = np.asarray(current.result(), dtype=np.float32)
+        chunks.append(chunk)
+        yield chunk
+
+    if cache_key is not None:
+        write_cache_file(cache_key, np.concatenate(chunks))
+
+
+async def astream_synthesis(
+    text: str,
+    speaker_wav: str,
+    cache_key: Optional[str] = None,
+) -> AsyncIterator[np.ndarray]:
+    """
+    Async iterator over stream_synthesis(); blocking waits run in the
+    default executor so the event loop stays free.
+    """
+    loop = asyncio.get_running_loop()
+    it = stream_synthesis(text, speaker_wav, cache_key)
+    sentinel = object()
+
+    while True:
+        chunk = await loop.run_in_executor(None, next, it, sentinel)
+        if chunk is sentinel:
+            break
+        yield chunk
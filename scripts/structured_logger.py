@@ -1,18 +1,285 @@
 # scripts/structured_logger.py
 
+import atexit
+import fcntl
+import gzip
 import json
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+
+from scripts.config_loader import CONFIG
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
 LOG_FILE = LOG_DIR / "voice_evolution.log"
 
+_LOG_CFG = CONFIG.get("logging", {})
+MAX_QUEUE = int(_LOG_CFG.get("max_queue", 10000))
+BATCH_SIZE = int(_LOG_CFG.get("batch_size", 256))
+FLUSH_INTERVAL_SEC = float(_LOG_CFG.get("flush_interval_sec", 1.0))
+MAX_BYTES = int(_LOG_CFG.get("max_bytes", 10 * 1024 ** 2))
+ROTATE_INTERVAL_SEC = float(_LOG_CFG.get("rotate_interval_sec", 86400))
+BACKUPS = int(_LOG_CFG.get("backups", 7))
+COMPRESS = bool(_LOG_CFG.get("compress", True))
+
+
+# ------------------ WRITER ------------------
+
+class AsyncEventLogger:
+    """
+    JSON-lines logger with a background writer thread.
+
+    log() serializes the record on the caller's thread (so later
+    changes to a payload dict are not logged) and does a non-blocking
+    enqueue; the writer drains the bounded queue in batches (one write
+    + flush per batch) and rotates the file by size or age,
+    gzip-compressing rotated files. When the queue is full events are
+    dropped and counted, and the count is written as a LOG_DROPPED
+    record once there is room again.
+
+    Rotation assumes this logger is the file's only writer; see
+    get_event_logger() for how processes get separate files.
+    """
+
+    def __init__(
+        self,
+        path: Path = LOG_FILE,
+        max_queue: int = MAX_QUEUE,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL_SEC,
+        max_bytes: int = MAX_BYTES,
+        rotate_interval: float = ROTATE_INTERVAL_SEC,
+        backups: int = BACKUPS,
+        compress: bool = COMPRESS,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backups = backups
+        self.compress = compress
+
+        self.dropped = 0
+        self._reported_drops = 0
+        self._drop_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._file = None
+        self._opened_at = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="event-logger", daemon=True)
+        self._thread.start()
+
+    # ------------------ PRODUCER ------------------
+
+    def log(self, record: dict):
+        try:
+            line = json.dumps(record, default=str)
+            self._queue.put_nowait(line)
+        except (TypeError, ValueError, queue.Full):   # unserializable / full
+            with self._drop_lock:
+                self.dropped += 1
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """
+        Blocks until everything enqueued so far is on disk.
+        """
+        if not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 5.0):
+        self.flush(timeout)
+        self._stop.set()
+        self._thread.join(timeout)
+
+    # ------------------ WRITER THREAD ------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception:
+                pass  # logging must never take the pipeline down
+            finally:
+                for item in batch:
+                    if isinstance(item, threading.Event):
+                        item.set()
+
+        if self._file is not None:
+            self._file.close()
+
+    def _write_batch(self, batch: list):
+        lines = []
+
+        with self._drop_lock:
+            new_drops = self.dropped - self._reported_drops
+            self._reported_drops = self.dropped
+        if new_drops:
+            lines.append(json.dumps({
+                "timestamp_utc": datetime.utcnow().isoformat() + "Z",
+                "event_type": "LOG_DROPPED",
+                "payload": {"dropped": new_drops, "total_dropped": self._reported_drops},
+            }))
+
+        for item in batch:
+            if isinstance(item, threading.Event):
+                continue
+            lines.append(item)
+
+        if not lines:
+            return
+
+        self._maybe_rotate()
+        f = self._open()
+        f.write("\n".join(lines) + "\n")
+        f.flush()
+
+    # ------------------ ROTATION ------------------
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._opened_at = time.time()
+        return self._file
+
+    def _maybe_rotate(self):
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            if self._file is not None:   # moved away externally
+                self._file.close()
+                self._file = None
+            return
+
+        too_big = self.max_bytes > 0 and size >= self.max_bytes
+        too_old = (
+            self.rotate_interval > 0
+            and self._file is not None
+            and time.time() - self._opened_at >= self.rotate_interval
+        )
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+        rotated = self.path.with_name(f"{self.path.name}.{stamp}")
+        try:
+            os.replace(self.path, rotated)
+        except FileNotFoundError:
+            return
+
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        old = sorted(self.path.parent.glob(f"{self.path.name}.*"))
+        for p in old[:max(0, len(old) - self.backups)]:
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+
+_LOGGER: Optional[AsyncEventLogger] = None
+_LOGGER_PID: Optional[int] = None
+_LOGGER_LOCK = threading.Lock()
+_SLOT_FILE = None   # held open (and flocked) for the life of the process
+
+
+def _claim_slot() -> int:
+    """
+    Lowest worker slot whose lock no live process holds. The flock is
+    released when the process exits, so a respawned worker reuses its
+    predecessor's slot instead of opening a new file.
+    """
+    global _SLOT_FILE
+    slot = 0
+    while True:
+        lf = open(LOG_DIR / f"{LOG_FILE.stem}.worker{slot}.lock", "a")
+        try:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lf.close()
+            slot += 1
+            continue
+        _SLOT_FILE = lf
+        return slot
+
+
+def _process_log_file() -> Path:
+    # pool workers get logs/voice_evolution.worker<slot>.log: several
+    # processes appending to (and rotating) one file would lose lines,
+    # and per-PID names would pile up as pools respawn. The number of
+    # files is bounded by the most workers ever alive at once.
+    # Independently launched programs still share LOG_FILE: run one
+    # writer per file.
+    if multiprocessing.parent_process() is None:
+        return LOG_FILE
+    return LOG_FILE.with_name(f"{LOG_FILE.stem}.worker{_claim_slot()}{LOG_FILE.suffix}")
+
+
+def get_event_logger() -> AsyncEventLogger:
+    """
+    Per-process singleton (re-created after fork: threads don't survive it).
+    """
+    global _LOGGER, _LOGGER_PID
+    if _LOGGER is None or _LOGGER_PID != os.getpid():
+        with _LOGGER_LOCK:
+            if _LOGGER is None or _LOGGER_PID != os.getpid():
+                _LOGGER = AsyncEventLogger(path=_process_log_file())
+                _LOGGER_PID = os.getpid()
+    return _LOGGER
+
+
+def flush_logs(timeout: Optional[float] = 5.0) -> bool:
+    if _LOGGER is None or _LOGGER_PID != os.getpid():
+        return True
+    return _LOGGER.flush(timeout)
+
+
+@atexit.register
+def _shutdown():
+    if _LOGGER is not None and _LOGGER_PID == os.getpid():
+        _LOGGER.close()
+
 
 def log_event(event_type: str, payload: dict):
     """
     Write structured JSON log for every important system decision.
+    Non-blocking: the record is queued for the background writer.
     """
 
     record = {
@@ -21,5 +288,4 @@ def log_event(event_type: str, payload: dict):
         "payload": payload,
     }
 
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record) + "\n")
\ No newline at end of file
+    get_event_logger().log(record)
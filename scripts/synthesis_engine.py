@@ -0,0 +1,154 @@
+# scripts/synthesis_engine.py
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from scripts.config_loader import CONFIG
+
+# ------------------ CONFIG ------------------
+
+_SYN_CFG = CONFIG.get("synthesis", {})
+
+MODEL_NAME = _SYN_CFG.get("model_name", "tts_models/multilingual/multi-dataset/xtts_v2")
+SAMPLE_RATE = _SYN_CFG.get("sample_rate", 24000)
+LANGUAGE = _SYN_CFG.get("language", "en")
+NUM_THREADS = _SYN_CFG.get("num_threads")
+MAX_QUEUE = _SYN_CFG.get("max_queue", 8)
+
+
+class SynthesisBusy(RuntimeError):
+    """Raised when the bounded request queue is full."""
+
+
+# ------------------ ENGINE ------------------
+
+class SynthesisEngine:
+    """
+    Resident XTTS engine.
+
+    The model is loaded once, inside the worker thread, and a bounded
+    queue of requests is served in order. Callers get a Future that
+    resolves to the float waveform at SAMPLE_RATE.
+    """
+
+    def __init__(
+        self,
+        model_name: str = MODEL_NAME,
+        num_threads: Optional[int] = NUM_THREADS,
+        max_queue: int = MAX_QUEUE,
+    ):
+        self.model_name = model_name
+        self.num_threads = num_threads
+        self.sample_rate = SAMPLE_RATE
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._tts = None
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    # ------------------ MODEL ------------------
+
+    def _load(self):
+        if self._tts is None:
+            import torch
+            from TTS.api import TTS
+
+            if self.num_threads:
+                torch.set_num_threads(int(self.num_threads))
+
+            self._tts = TTS(model_name=self.model_name)
+        return self._tts
+
+    @property
+    def tts(self):
+        """
+        The loaded TTS object (loads on first access).
+        Only the worker thread should run inference on it.
+        """
+        return self._load()
+
+    # ------------------ WORKER ------------------
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="xtts-worker", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            fn, kwargs, future = self._queue.get()
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(fn(self._load(), **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    # ------------------ PUBLIC API ------------------
+
+    def submit_call(self, fn, block: bool = False, timeout: Optional[float] = None, **kwargs) -> Future:
+        """
+        Queues `fn(tts, **kwargs)` on the worker thread.
+        Raises SynthesisBusy if the queue stays full.
+        """
+        self._ensure_worker()
+        future = Future()
+        try:
+            self._queue.put((fn, kwargs, future), block=block, timeout=timeout)
+        except queue.Full:
+            raise SynthesisBusy(f"Synthesis queue full ({self._queue.maxsize} pending)")
+        return future
+
+    def submit(
+        self,
+        text: str,
+        speaker_wav: str,
+        language: str = LANGUAGE,
+        block: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Future:
+        return self.submit_call(
+            _tts_call, block=block, timeout=timeout,
+            text=text, speaker_wav=speaker_wav, language=language,
+            model_name=self.model_name,
+        )
+
+    def synthesize(self, text: str, speaker_wav: str, language: str = LANGUAGE, timeout: Optional[float] = None):
+        """
+        Blocking convenience wrapper: waits for queue space and the result.
+        """
+        return self.submit(text, speaker_wav, language, block=True, timeout=timeout).result(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+def _tts_call(tts, text: str, speaker_wav: str, language: str, model_name: str):
+    # conditioning latents are computed once per reference clip
+    from scripts.speaker_latents import synthesize_with_latents
+    return synthesize_with_latents(tts, text, speaker_wav, language, model_name)
+
+
+# ------------------ SHARED INSTANCE ------------------
+
+_ENGINE: Optional[SynthesisEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_synthesis_engine() -> SynthesisEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = SynthesisEngine()
+    return _ENGINE
@@ -1,8 +1,7 @@
 import numpy as np
 from pathlib import Path
-import tempfile
-import subprocess
-import sys
+
+from scripts.synthesize_from_embedding import synthesize_from_embedding
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
@@ -16,21 +15,13 @@ def synthesize_aged_voice(
     Synthesize voice using aged embedding but real speaker timbre.
     """
 
-    # 1️⃣ Save aged embedding temporarily
-    tmp_emb = Path(tempfile.gettempdir()) / "aged_embedding.npy"
-    np.save(tmp_emb, aged_embedding)
-
-    # 2️⃣ Call existing synthesis pipeline
-    subprocess.run(
-        [
-            sys.executable,
-            "scripts/synthesize_from_embedding.py",
-            text,
-            out_wav,
-            "--speaker_wav",
-            reference_wav,
-        ],
-        check=True,
+    # In-process: goes through the resident XTTS engine
+    # instead of a new interpreter + model load per request
+    synthesize_from_embedding(
+        text=text,
+        out_path=out_wav,
+        speaker_embedding=aged_embedding,
+        reference_wav=reference_wav,
     )
 
     return out_wav
\ No newline at end of file
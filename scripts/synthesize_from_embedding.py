@@ -1,21 +1,15 @@
 # scripts/synthesize_from_embedding.py
 
 import argparse
-import hashlib
 import shutil
 from pathlib import Path
 
 import soundfile as sf
-from TTS.api import TTS
 
 from scripts.rate_limiter import check_rate_limit
 from scripts.structured_logger import log_event
-from scripts.audio_cache import get_cached_audio
-
-# ------------------ CONSTANTS ------------------
-
-MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"
-SAMPLE_RATE = 24000
+from scripts.audio_cache import get_cache_index, get_cached_audio, make_cache_key, write_cache_file
+from scripts.synthesis_engine import MODEL_NAME, SAMPLE_RATE, get_synthesis_engine
 
 
 # ================== PROGRAMMATIC API ==================
@@ -45,37 +39,21 @@ def synthesize_from_embedding(
 
 # ================== INTERNAL SYNTHESIS ==================
 
-def _synthesize_and_cache(text: str, speaker_wav: str, cache_path: Path):
+def _synthesize_and_cache(text: str, speaker_wav: str, cache_key: str):
     """
     Internal XTTS synthesis (single place)
     """
 
-    print("🔊 Loading XTTS model...")
-    tts = TTS(model_name=MODEL_NAME)
-
     print("🎙️ Synthesizing voice...")
-    wav = tts.tts(
+    wav = get_synthesis_engine().synthesize(
         text=text,
         speaker_wav=speaker_wav,
-        language="en"
     )
 
-    sf.write(cache_path, wav, SAMPLE_RATE)
+    write_cache_file(cache_key, wav)
     return wav
 
 
-# ================== CACHE HELPERS ==================
-
-CACHE_DIR = Path("cache/audio")
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-
-
-def make_cache_key(text: str, speaker_wav: str) -> str:
-    speaker_wav = str(Path(speaker_wav).resolve())
-    key = f"{MODEL_NAME}|{text}|{speaker_wav}"
-    return hashlib.sha256(key.encode("utf-8")).hexdigest()
-
-
 # ================== CLI ENTRY ==================
 
 def main(text: str, out_path: str, speaker_wav: str):
@@ -97,9 +75,9 @@ def main(text: str, out_path: str, speaker_wav: str):
 
     # -------- Cache lookup --------
     cache_key = make_cache_key(text, speaker_wav)
-    cached_file = CACHE_DIR / f"{cache_key}.wav"
+    cached_file = get_cache_index().lookup(cache_key)
 
-    if cached_file.exists():
+    if cached_file is not None:
         log_event("CACHE_HIT", {
             "user_id": user_id,
             "output": str(out_path),
@@ -115,7 +93,7 @@ def main(text: str, out_path: str, speaker_wav: str):
     })
 
     # -------- Synthesis --------
-    wav = _synthesize_and_cache(text, speaker_wav, cached_file)
+    wav = _synthesize_and_cache(text, speaker_wav, cache_key)
 
     sf.write(out_path, wav, SAMPLE_RATE)
 
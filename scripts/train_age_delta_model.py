@@ -7,6 +7,8 @@ from collections import defaultdict
 from sklearn.linear_model import Ridge
 import joblib
 
+from scripts.embedding_store import load_embedding_ref
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 DATA_FILE = PROJECT_ROOT / "learning" / "age_embedding_dataset.csv"
 MODEL_DIR = PROJECT_ROOT / "learning" / "models"
@@ -18,10 +20,8 @@ MODEL_PATH = MODEL_DIR / "age_delta_ridge.joblib"
 # ------------------ SAFE LOADER ------------------
 
 def load_embedding(path: str) -> np.ndarray | None:
-    full_path = PROJECT_ROOT / path
-    if not full_path.exists():
-        return None
-    return np.load(full_path).astype("float32")
+    # packed-store ref or legacy .npy
+    return load_embedding_ref(path)
 
 
 # ------------------ MAIN ------------------
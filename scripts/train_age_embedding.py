@@ -17,9 +17,11 @@ import torch.nn as nn
 import torch.optim as optim
 from torch.utils.data import DataLoader
 
-from scripts.phase3_dataset import UnifiedVoiceDataset
-from scripts.phase3_model import AgeEmbeddingModel
-from scripts.phase3_collate import voice_collate_fn
+from scripts.phase3_dataset import UnifiedVoiceDataset, CachedFeatureDataset
+from scripts.phase3_model import AgeEmbeddingModel, MODEL_NAME
+from scripts.phase3_collate import voice_collate_fn, feature_collate_fn
+from scripts.phase3_sampler import LengthBucketBatchSampler
+from scripts.backbone_feature_cache import BackboneFeatureCache
 
 # ---------------- CONFIG ----------------
 
@@ -27,8 +29,18 @@ MANIFESTS = [
     "data/librispeech_manifest_small.csv",
 ]
 
-BATCH_SIZE = 1               # safe for 8GB RAM
-GRAD_ACCUM_STEPS = 8         # effective batch = 8
+# Backbone is frozen: run it once per file and train the head on
+# cached pooled features (set False for the raw-audio path).
+USE_FEATURE_CACHE = True
+CACHE_BATCH_SIZE = 8         # backbone batch while filling the cache
+FEATURE_BATCH_SIZE = 256     # head-only batches are tiny
+
+# Raw-audio path: fixed crops + length buckets keep padding small, so
+# real batches fit where full-length padding forced batch size 1.
+CROP_SECONDS = 6.0
+BATCH_SIZE = 16
+MAX_BATCH_FRAMES = 16 * 6 * 16000   # padded-sample budget per batch
+GRAD_ACCUM_STEPS = 1
 EPOCHS = 3                   # sanity run
 LR = 1e-4
 CHECKPOINT_PATH = "models/age_embedding_v1.pt"
@@ -47,27 +59,55 @@ print("Using device:", device)
 
 dataset = UnifiedVoiceDataset(
     manifest_paths=MANIFESTS,
-    max_samples=None
+    max_samples=None,
+    crop_seconds=None if USE_FEATURE_CACHE else CROP_SECONDS,
 )
 
 print("Dataset size:", len(dataset))
 
-loader = DataLoader(
-    dataset,
-    batch_size=BATCH_SIZE,
-    shuffle=True,
-    drop_last=True,
-    collate_fn=voice_collate_fn
-)
+if USE_FEATURE_CACHE:
+    cache = BackboneFeatureCache()
+    cache.build(
+        [s["path"] for s in dataset.samples],
+        batch_size=CACHE_BATCH_SIZE,
+        device=device,
+    )
+    dataset = CachedFeatureDataset(dataset, cache)
+
+    loader = DataLoader(
+        dataset,
+        batch_size=FEATURE_BATCH_SIZE,
+        shuffle=True,
+        drop_last=False,
+        collate_fn=feature_collate_fn
+    )
+else:
+    from transformers import Wav2Vec2Config
+
+    # wav2vec2-base takes no attention_mask, so padding would leak into
+    # its GroupNorm / attention: batch equal-length crops only
+    exact = Wav2Vec2Config.from_pretrained(MODEL_NAME).feat_extract_norm != "layer"
+
+    loader = DataLoader(
+        dataset,
+        batch_sampler=LengthBucketBatchSampler(
+            dataset.lengths,
+            batch_size=BATCH_SIZE,
+            max_frames=MAX_BATCH_FRAMES,
+            exact_lengths=exact,
+        ),
+        collate_fn=voice_collate_fn
+    )
 
 # ---------------- MODEL ----------------
 
-model = AgeEmbeddingModel(device=device)
+model = AgeEmbeddingModel(device=device, load_backbone=not USE_FEATURE_CACHE)
 model.train()
 
 # Freeze wav2vec backbone (CRITICAL)
-for p in model.backbone.parameters():
-    p.requires_grad = False
+if model.backbone is not None:
+    for p in model.backbone.parameters():
+        p.requires_grad = False
 
 optimizer = optim.AdamW(
     filter(lambda p: p.requires_grad, model.parameters()),
@@ -78,26 +118,63 @@ age_loss_fn = nn.L1Loss()
 
 # ---------------- TRAINING ----------------
 
+def train_cached_epoch():
+    """
+    One epoch over cached features: full batches, one step per batch,
+    only labelled samples contribute.
+    """
+    for batch_idx, sample in enumerate(loader):
+        labelled = [i for i, a in enumerate(sample["age"]) if a is not None]
+        if not labelled:
+            continue
+
+        feats = sample["features"][labelled].to(device, dtype=torch.float32)
+        age_tensor = torch.tensor(
+            [sample["age"][i] for i in labelled],
+            dtype=torch.float32,
+            device=device
+        )
+
+        emb = model.forward_features(feats)      # (B, 128)
+        pred_age = emb.contiguous().norm(dim=1)
+
+        loss = age_loss_fn(pred_age, age_tensor)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+        if batch_idx % 10 == 0:
+            print(f"Step {batch_idx} | Loss: {loss.item():.4f}")
+
+
 global_step = 0
 optimizer.zero_grad()
 
 for epoch in range(EPOCHS):
     print(f"\n===== Epoch {epoch + 1}/{EPOCHS} =====")
 
+    if USE_FEATURE_CACHE:
+        train_cached_epoch()
+        continue
+
     for batch_idx, sample in enumerate(loader):
-        audio = sample["audio"].to(device)   # (B, T)
         ages = sample["age"]                 # list with None or value
 
-        emb = model(audio)                   # (B, 128)
-
         # -------------------------------------------------
         # SUPERVISED TRAINING ONLY
         # -------------------------------------------------
-        if ages[0] is None:
+        labelled = [i for i, a in enumerate(ages) if a is not None]
+        if not labelled:
             continue  # ✅ no backward, no graph pollution
 
+        audio = sample["audio"][labelled].to(device)            # (B, T)
+        lengths = sample["lengths"][labelled]
+        attention_mask = sample["attention_mask"][labelled].to(device)
+
+        emb = model(audio, lengths=lengths, attention_mask=attention_mask)  # (B, 128)
+
         age_tensor = torch.tensor(
-            [ages[0]],
+            [ages[i] for i in labelled],
             dtype=torch.float32,
             device=device
         )
@@ -127,7 +204,9 @@ torch.save(
         "model_state": model.state_dict(),
         "config": {
             "embedding_dim": 128,
-            "backbone": "wav2vec2-base-960h"
+            "backbone": "wav2vec2-base-960h",
+            # cached-feature runs save the head only; load with strict=False
+            "head_only": USE_FEATURE_CACHE
         }
     },
     CHECKPOINT_PATH
@@ -0,0 +1,271 @@
+# scripts/user_faiss_index.py
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import faiss
+
+from scripts.config_loader import CONFIG
+from scripts.embedding_store import load_embedding_ref
+
+# ------------------ PATH ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+USERS_DIR = PROJECT_ROOT / "users"
+
+COMPACT_ROWS = int(CONFIG.get("faiss", {}).get("compact_rows", 64))
+
+# user_id -> ((index mtime_ns, log size), checksum, index, version_ids)
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+# ------------------ CHECKSUM ------------------
+
+def _indexed(versions: list) -> list:
+    return [v for v in versions if v.get("embedding_path")]
+
+
+def roll_checksum(prev: str, version: dict) -> str:
+    """
+    Rolling checksum over the indexed versions, so an append only
+    hashes the new entry.
+    """
+    key = f"{prev}|{version['version_id']}:{version['embedding_path']}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def versions_checksum(versions: list) -> str:
+    checksum = ""
+    for v in _indexed(versions):
+        checksum = roll_checksum(checksum, v)
+    return checksum
+
+
+def _normalize_rows(embs: np.ndarray) -> np.ndarray:
+    embs = np.ascontiguousarray(embs, dtype="float32")
+    norms = np.linalg.norm(embs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embs / norms
+
+
+# ------------------ INDEX ------------------
+
+class UserFaissIndex:
+    """
+    Per-user IndexFlatIP persisted next to users/<id>.json.
+
+    users/<id>.faiss       normalized embeddings, one row per version
+    users/<id>.faiss.meta  row -> version_id map + checksum of the
+                           registry's versions at write time
+    users/<id>.faiss.log   versions appended since, one JSON line each
+
+    append() only writes one line to the log; every COMPACT_ROWS lines
+    the log is folded into the index and removed, so the per-version
+    cost does not grow with the index.
+    """
+
+    def __init__(self, user_id: str, users_dir: Path = USERS_DIR):
+        self.user_id = user_id
+        self.index_path = Path(users_dir) / f"{user_id}.faiss"
+        self.meta_path = Path(users_dir) / f"{user_id}.faiss.meta"
+        self.log_path = Path(users_dir) / f"{user_id}.faiss.log"
+
+    # ------------------ DISK ------------------
+
+    def _read_meta(self) -> Optional[dict]:
+        if not self.meta_path.exists() or not self.index_path.exists():
+            return None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _write(self, index: faiss.Index, version_ids: List[str], checksum: str):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_index = self.index_path.with_suffix(".faiss.tmp")
+        faiss.write_index(index, str(tmp_index))
+        os.replace(tmp_index, self.index_path)
+
+        tmp_meta = self.meta_path.with_suffix(".meta.tmp")
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({
+                "version_ids": version_ids,
+                "checksum": checksum,
+                "ntotal": int(index.ntotal),
+                "dim": int(index.d),
+            }, f)
+        os.replace(tmp_meta, self.meta_path)
+
+        # the index now holds every logged row
+        try:
+            os.remove(self.log_path)
+        except FileNotFoundError:
+            pass
+
+        with _CACHE_LOCK:
+            _CACHE.pop(self.user_id, None)
+
+    def _read_log(self) -> list:
+        """
+        Appended entries in order. A torn line from a crash is skipped;
+        the checksum chain then no longer matches and load() rebuilds.
+        """
+        entries = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _stamp(self):
+        stamp = []
+        for p, field in ((self.index_path, "st_mtime_ns"), (self.log_path, "st_size")):
+            try:
+                stamp.append(getattr(p.stat(), field))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _state(self) -> Tuple[Optional[dict], list, Optional[str]]:
+        """
+        (meta, log entries, checksum of index + log), or Nones when
+        there is no index on disk.
+        """
+        meta = self._read_meta()
+        if meta is None:
+            return None, [], None
+        entries = self._read_log()
+        checksum = meta.get("checksum")
+        for e in entries:
+            checksum = roll_checksum(checksum, e)
+        return meta, entries, checksum
+
+    def _with_log(self, meta: dict, entries: list, mmap: bool) -> Tuple[faiss.Index, List[str]]:
+        ids = list(meta["version_ids"])
+        if not entries:
+            return self._read_index(mmap=mmap), ids
+
+        index = self._read_index(mmap=False)
+        index.add(_normalize_rows(np.vstack([
+            np.asarray(e["embedding"], dtype="float32") for e in entries
+        ])))
+        return index, ids + [str(e["version_id"]) for e in entries]
+
+    def _read_index(self, mmap: bool = True) -> faiss.Index:
+        if mmap:
+            try:
+                return faiss.read_index(str(self.index_path), faiss.IO_FLAG_MMAP)
+            except Exception:
+                pass  # older faiss builds cannot mmap flat indexes
+        return faiss.read_index(str(self.index_path))
+
+    # ------------------ BUILD / APPEND ------------------
+
+    def rebuild(self, versions: list) -> Tuple[Optional[faiss.Index], List[str]]:
+        """
+        Full rebuild from the stored embeddings (staleness fallback).
+        """
+        embs, ids = [], []
+        for v in _indexed(versions):
+            e = load_embedding_ref(v["embedding_path"])
+            if e is not None:
+                embs.append(e.reshape(-1))
+                ids.append(str(v["version_id"]))
+
+        if not embs:
+            return None, []
+
+        matrix = _normalize_rows(np.vstack(embs))
+        index = faiss.IndexFlatIP(matrix.shape[1])
+        index.add(matrix)
+
+        self._write(index, ids, versions_checksum(versions))
+        return index, ids
+
+    def append(self, version: dict, embedding: np.ndarray, prior_versions: list):
+        """
+        Adds one new version. `prior_versions` is the registry list
+        BEFORE the append; a checksum mismatch means the persisted
+        index is stale and it is rebuilt instead.
+        """
+        all_versions = list(prior_versions) + [version]
+
+        meta, entries, checksum = self._state()
+        if meta is None or checksum != versions_checksum(prior_versions):
+            self.rebuild(all_versions)
+            return
+
+        entry = {
+            "version_id": version["version_id"],
+            "embedding_path": version["embedding_path"],
+            "embedding": np.asarray(embedding, dtype="float32").reshape(-1).tolist(),
+        }
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        entries.append(entry)
+
+        with _CACHE_LOCK:
+            _CACHE.pop(self.user_id, None)
+
+        if len(entries) >= COMPACT_ROWS:
+            index, ids = self._with_log(meta, entries, mmap=False)
+            self._write(index, ids, roll_checksum(checksum, entry))
+
+    # ------------------ LOAD / SEARCH ------------------
+
+    def load(self, versions: list) -> Tuple[Optional[faiss.Index], List[str]]:
+        """
+        Returns (index, version_ids). A warm process cache answers with
+        no file reads; otherwise the index is memory-mapped from disk
+        (read into memory when logged rows must be added), and rebuilt
+        only if its checksum no longer matches `versions`.
+        """
+        expected = versions_checksum(versions)
+        stamp = self._stamp()
+
+        with _CACHE_LOCK:
+            cached = _CACHE.get(self.user_id)
+        if cached and cached[0] == stamp and cached[1] == expected:
+            return cached[2], cached[3]
+
+        meta, entries, checksum = self._state()
+        if meta is not None and checksum == expected:
+            index, ids = self._with_log(meta, entries, mmap=True)
+            if index.ntotal != len(ids):
+                index, ids = self.rebuild(versions)
+        else:
+            index, ids = self.rebuild(versions)
+
+        if index is not None:
+            with _CACHE_LOCK:
+                _CACHE[self.user_id] = (self._stamp(), expected, index, ids)
+
+        return index, ids
+
+    def search(self, embedding: np.ndarray, versions: list, k: int = 1):
+        """
+        Returns (similarities, version_ids) of the k best matches.
+        """
+        index, ids = self.load(versions)
+        if index is None or index.ntotal == 0:
+            return [], []
+
+        q = _normalize_rows(np.asarray(embedding).reshape(1, -1))
+        D, I = index.search(q, min(k, index.ntotal))
+        return (
+            [float(d) for d in D[0]],
+            [ids[i] for i in I[0] if i >= 0],
+        )
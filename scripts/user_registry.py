@@ -1,9 +1,10 @@
 # scripts/user_registry.py
 
-import json
 from pathlib import Path
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
+
+from scripts.user_storage import JsonUserBackend, get_user_backend
 
 # ------------------ PATH ------------------
 
@@ -16,11 +17,9 @@ USERS_DIR.mkdir(exist_ok=True)
 class UserRegistry:
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.user_file = USERS_DIR / f"{user_id}.json"
+        self.backend = get_user_backend()
 
-        if self.user_file.exists():
-            self._load()
-        else:
+        if not self._load():
             self.data = {
                 "user_id": user_id,
                 "date_of_birth": None,
@@ -28,17 +27,32 @@ class UserRegistry:
                 "registered_devices": [],
                 "voice_versions": []
             }
-            self._save()
+            self.backend.create_user(self.data)
 
     # ------------------ CORE ------------------
 
-    def _load(self):
-        with open(self.user_file, "r", encoding="utf-8") as f:
-            self.data = json.load(f)
+    def _load(self) -> bool:
+        data = self.backend.load_user(self.user_id)
+
+        if data is None and not isinstance(self.backend, JsonUserBackend):
+            # not imported yet: pick up a legacy users/<id>.json on first use
+            data = JsonUserBackend(USERS_DIR).load_user(self.user_id)
+            if data is not None:
+                data.setdefault("registered_devices", [])
+                data.setdefault("voice_versions", [])
+                self.backend.save_user(data)
+
+        if data is None:
+            return False
+        self.data = data
+        return True
 
     def _save(self):
-        with open(self.user_file, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, indent=2)
+        """
+        Full rewrite of the user record. Incremental mutators below
+        go through the backend's append/update paths instead.
+        """
+        self.backend.save_user(self.data)
 
     # ------------------ DOB ------------------
 
@@ -47,7 +61,8 @@ class UserRegistry:
         dob format: YYYY-MM-DD
         """
         self.data["date_of_birth"] = dob
-        self._save()
+        self.backend.set_date_of_birth(self.user_id, dob)
+        self._refresh_trajectory()
 
     def calculate_age(self, recording_date: Optional[str] = None) -> Optional[int]:
         if not self.data["date_of_birth"]:
@@ -72,12 +87,13 @@ class UserRegistry:
             if d["device_id"] == device_id:
                 return  # already registered
 
-        self.data["registered_devices"].append({
+        device = {
             "device_id": device_id,
             "fingerprint": fingerprint,
             "first_seen_utc": datetime.utcnow().isoformat() + "Z"
-        })
-        self._save()
+        }
+        self.data["registered_devices"].append(device)
+        self.backend.append_device(self.user_id, device)
 
     # ------------------ VOICE VERSIONS ------------------
 
@@ -88,14 +104,16 @@ class UserRegistry:
         audio_path: str,
         confidence: float,
         voice_type: str = "RECORDED",
-        recorded_utc: Optional[str] = None
+        recorded_utc: Optional[str] = None,
+        embedding=None
     ):
         if not recorded_utc:
             recorded_utc = datetime.utcnow().isoformat() + "Z"
 
         age = self.calculate_age(recorded_utc)
 
-        self.data["voice_versions"].append({
+        prior_versions = list(self.data["voice_versions"])
+        version = {
             "version_id": version_id,
             "recorded_utc": recorded_utc,
             "age_at_recording": age,
@@ -103,9 +121,43 @@ class UserRegistry:
             "audio_path": audio_path,
             "confidence": round(confidence, 3),
             "type": voice_type
-        })
+        }
+        self.data["voice_versions"].append(version)
 
-        self._save()
+        self.backend.append_version(self.user_id, version)
+        self._index_version(version, embedding, prior_versions)
+        self._refresh_trajectory()
+
+    def _index_version(self, version: dict, embedding, prior_versions: list):
+        """
+        Keeps users/<id>.faiss in step with the registry.
+        Best-effort: detect_change() rebuilds a stale index on its own.
+        """
+        if not version.get("embedding_path"):
+            return
+        try:
+            from scripts.embedding_store import load_embedding_ref
+            from scripts.user_faiss_index import UserFaissIndex
+
+            if embedding is None:
+                embedding = load_embedding_ref(version["embedding_path"])
+            if embedding is None:
+                return
+            UserFaissIndex(self.user_id).append(version, embedding, prior_versions)
+        except Exception:
+            pass
+
+    def _refresh_trajectory(self):
+        """
+        Incremental rebuild of the age trajectory table.
+        Best-effort: while the table is stale, playback falls back to
+        per-request decisions.
+        """
+        try:
+            from scripts.age_trajectory import refresh_trajectory
+            refresh_trajectory(self.user_id, self.data["voice_versions"])
+        except Exception:
+            pass
 
     # ------------------ READ HELPERS ------------------
 
@@ -121,6 +173,22 @@ class UserRegistry:
         )[-1]
 
 
+def user_revision(user_id: str) -> Optional[tuple]:
+    """
+    Cheap stamp that changes whenever the user record changes;
+    used to invalidate per-user caches without loading the record.
+    """
+    return get_user_backend().user_revision(user_id)
+
+
+def list_users() -> List[str]:
+    backend = get_user_backend()
+    users = set(backend.list_users())
+    if not isinstance(backend, JsonUserBackend):
+        users.update(JsonUserBackend(USERS_DIR).list_users())  # not yet imported
+    return sorted(users)
+
+
 # ======================================================================
 # 🔥 BACKWARD-COMPATIBILITY FUNCTIONS (THIS FIXES YOUR LOOP)
 # ======================================================================
@@ -0,0 +1,322 @@
+# scripts/user_storage.py
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from scripts.config_loader import CONFIG
+
+# ------------------ PATH ------------------
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+USERS_DIR = PROJECT_ROOT / "users"
+
+_STORAGE_CFG = CONFIG.get("storage", {})
+BACKEND = _STORAGE_CFG.get("backend", "sqlite")
+SQLITE_PATH = PROJECT_ROOT / _STORAGE_CFG.get("sqlite_path", "users/registry.db")
+
+VERSION_COLUMNS = (
+    "version_id", "recorded_utc", "age_at_recording", "embedding_path",
+    "audio_path", "confidence", "type",
+)
+
+
+# ------------------ JSON BACKEND ------------------
+
+class JsonUserBackend:
+    """
+    Original layout: one users/<id>.json rewritten on every change.
+    """
+
+    def __init__(self, users_dir: Path = USERS_DIR):
+        self.users_dir = Path(users_dir)
+        self.users_dir.mkdir(exist_ok=True)
+
+    def _path(self, user_id: str) -> Path:
+        return self.users_dir / f"{user_id}.json"
+
+    def load_user(self, user_id: str) -> Optional[dict]:
+        path = self._path(user_id)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_user(self, data: dict):
+        with open(self._path(data["user_id"]), "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    def create_user(self, data: dict):
+        self.save_user(data)
+
+    def _mutate(self, user_id: str, fn):
+        data = self.load_user(user_id)
+        fn(data)
+        self.save_user(data)
+
+    def set_date_of_birth(self, user_id: str, dob: Optional[str]):
+        self._mutate(user_id, lambda d: d.__setitem__("date_of_birth", dob))
+
+    def append_device(self, user_id: str, device: dict):
+        self._mutate(user_id, lambda d: d["registered_devices"].append(device))
+
+    def append_version(self, user_id: str, version: dict):
+        self._mutate(user_id, lambda d: d["voice_versions"].append(version))
+
+    def list_users(self) -> List[str]:
+        return sorted(p.stem for p in self.users_dir.glob("*.json"))
+
+    def user_revision(self, user_id: str) -> Optional[tuple]:
+        """
+        Cheap change stamp (no JSON parse): file mtime + size.
+        """
+        try:
+            st = self._path(user_id).stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+
+# ------------------ SQLITE BACKEND ------------------
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id        TEXT PRIMARY KEY,
+    date_of_birth  TEXT,
+    created_utc    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS devices (
+    user_id         TEXT NOT NULL,
+    device_id       TEXT NOT NULL,
+    fingerprint     TEXT,
+    first_seen_utc  TEXT,
+    PRIMARY KEY (user_id, device_id)
+);
+
+CREATE TABLE IF NOT EXISTS voice_versions (
+    seq               INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id           TEXT NOT NULL,
+    version_id        TEXT NOT NULL,
+    recorded_utc      TEXT,
+    age_at_recording  INTEGER,
+    embedding_path    TEXT,
+    audio_path        TEXT,
+    confidence        REAL,
+    type              TEXT,
+    extra             TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_versions_user_time
+    ON voice_versions (user_id, recorded_utc);
+
+CREATE INDEX IF NOT EXISTS idx_versions_user_age
+    ON voice_versions (user_id, age_at_recording);
+"""
+
+
+class SqliteUserBackend:
+    """
+    Single SQLite database in WAL mode. Appends are single-row INSERTs,
+    so write cost no longer grows with history size, and concurrent
+    workers serialize on SQLite's own lock instead of clobbering files.
+    """
+
+    def __init__(self, db_path: Path = SQLITE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # ------------------ ROW MAPPING ------------------
+
+    @staticmethod
+    def _version_row(user_id: str, v: dict) -> tuple:
+        extra = {k: val for k, val in v.items() if k not in VERSION_COLUMNS}
+        return (
+            user_id,
+            str(v.get("version_id")),
+            v.get("recorded_utc"),
+            v.get("age_at_recording"),
+            v.get("embedding_path"),
+            v.get("audio_path"),
+            v.get("confidence"),
+            v.get("type"),
+            json.dumps(extra) if extra else None,
+        )
+
+    @staticmethod
+    def _version_dict(row: sqlite3.Row) -> dict:
+        v = {k: row[k] for k in VERSION_COLUMNS}
+        if row["extra"]:
+            v.update(json.loads(row["extra"]))
+        return v
+
+    # ------------------ READ ------------------
+
+    def load_user(self, user_id: str) -> Optional[dict]:
+        conn = self._conn()
+        u = conn.execute(
+            "SELECT * FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if u is None:
+            return None
+
+        devices = [
+            {
+                "device_id": r["device_id"],
+                "fingerprint": json.loads(r["fingerprint"]) if r["fingerprint"] else None,
+                "first_seen_utc": r["first_seen_utc"],
+            }
+            for r in conn.execute(
+                "SELECT * FROM devices WHERE user_id = ? ORDER BY rowid", (user_id,)
+            )
+        ]
+        versions = [
+            self._version_dict(r)
+            for r in conn.execute(
+                "SELECT * FROM voice_versions WHERE user_id = ? ORDER BY seq", (user_id,)
+            )
+        ]
+
+        return {
+            "user_id": u["user_id"],
+            "date_of_birth": u["date_of_birth"],
+            "created_utc": u["created_utc"],
+            "registered_devices": devices,
+            "voice_versions": versions,
+        }
+
+    def list_users(self) -> List[str]:
+        return [
+            r["user_id"]
+            for r in self._conn().execute("SELECT user_id FROM users ORDER BY user_id")
+        ]
+
+    def user_revision(self, user_id: str) -> Optional[tuple]:
+        """
+        Cheap change stamp: DOB + version count + last version seq.
+        Any append, DOB edit or full save_user() changes it.
+        """
+        row = self._conn().execute(
+            "SELECT u.date_of_birth, "
+            "(SELECT COUNT(*) FROM voice_versions v WHERE v.user_id = u.user_id), "
+            "(SELECT MAX(seq) FROM voice_versions v WHERE v.user_id = u.user_id) "
+            "FROM users u WHERE u.user_id = ?",
+            (user_id,),
+        ).fetchone()
+        return tuple(row) if row is not None else None
+
+    # ------------------ WRITE ------------------
+
+    def create_user(self, data: dict):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO users (user_id, date_of_birth, created_utc) VALUES (?, ?, ?)",
+                (data["user_id"], data.get("date_of_birth"), data.get("created_utc")),
+            )
+
+    def set_date_of_birth(self, user_id: str, dob: Optional[str]):
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE users SET date_of_birth = ? WHERE user_id = ?", (dob, user_id)
+            )
+
+    def append_device(self, user_id: str, device: dict):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO devices (user_id, device_id, fingerprint, first_seen_utc) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    user_id,
+                    device["device_id"],
+                    json.dumps(device.get("fingerprint")),
+                    device.get("first_seen_utc"),
+                ),
+            )
+
+    def append_version(self, user_id: str, version: dict):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO voice_versions (user_id, version_id, recorded_utc, age_at_recording, "
+                "embedding_path, audio_path, confidence, type, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                self._version_row(user_id, version),
+            )
+
+    def save_user(self, data: dict):
+        """
+        Full replace (legacy save_user() / bulk edits). One transaction.
+        """
+        user_id = data["user_id"]
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO users (user_id, date_of_birth, created_utc) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "date_of_birth = excluded.date_of_birth, created_utc = excluded.created_utc",
+                (user_id, data.get("date_of_birth"), data.get("created_utc")),
+            )
+            conn.execute("DELETE FROM devices WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM voice_versions WHERE user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT INTO devices (user_id, device_id, fingerprint, first_seen_utc) VALUES (?, ?, ?, ?)",
+                [
+                    (user_id, d["device_id"], json.dumps(d.get("fingerprint")), d.get("first_seen_utc"))
+                    for d in data.get("registered_devices", [])
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO voice_versions (user_id, version_id, recorded_utc, age_at_recording, "
+                "embedding_path, audio_path, confidence, type, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._version_row(user_id, v) for v in data.get("voice_versions", [])],
+            )
+
+
+# ------------------ FACTORY ------------------
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def get_user_backend():
+    global _BACKEND
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                _BACKEND = SqliteUserBackend() if BACKEND == "sqlite" else JsonUserBackend()
+    return _BACKEND
+
+
+def import_json_users(users_dir: Path = USERS_DIR, backend=None, overwrite: bool = False) -> int:
+    """
+    One-shot import of users/*.json into the configured backend.
+    Existing users are skipped unless `overwrite` is set.
+    """
+    backend = backend or get_user_backend()
+    source = JsonUserBackend(users_dir)
+
+    imported = 0
+    for user_id in source.list_users():
+        if not overwrite and backend.load_user(user_id) is not None:
+            continue
+        data = source.load_user(user_id)
+        data.setdefault("registered_devices", [])
+        data.setdefault("voice_versions", [])
+        backend.save_user(data)
+        imported += 1
+    return imported
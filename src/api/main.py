@@ -1,7 +1,16 @@
 from pathlib import Path
 import csv
+import sys
 from typing import Optional, Dict, Any
 
+BASE_DIR = Path(__file__).resolve().parents[2]
+VERSIONS_CSV = BASE_DIR / "versions" / "versions.csv"
+
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from scripts.age_index import age_index_for, age_index_for_file
+
 def _load_versions_from_csv(meta_path: Path):
     rows = []
     if not meta_path.exists():
@@ -28,17 +37,7 @@ def _load_versions_from_csv(meta_path: Path):
     return rows
 
 def _choose_closest_version(versions, target_age: int):
-    best = None
-    best_diff = None
-    for v in versions:
-        age = v.get("age_at_recording")
-        if age is None:
-            continue
-        diff = abs(age - target_age)
-        if best is None or diff < best_diff:
-            best = v
-            best_diff = diff
-    return best, best_diff
+    return age_index_for(versions).nearest(target_age)
 
 def select_version_by_age(age: int, meta_path: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -53,12 +52,12 @@ def select_version_by_age(age: int, meta_path: Optional[str] = None) -> Dict[str
         except NameError:
             return {"error": "no_versions_defined", "message": "VERSIONS_CSV is not defined in the module."}
 
-    meta_path = Path(meta_path)
-    versions = _load_versions_from_csv(meta_path)
+    # parsed + indexed once per file change, not per request
+    versions, index = age_index_for_file(meta_path, _load_versions_from_csv)
     if not versions:
         return {"error": "no_versions", "message": "versions CSV missing or empty"}
 
-    chosen, diff = _choose_closest_version(versions, age)
+    chosen, diff = index.nearest(age)
     if chosen is None:
         # fallback: pick last entry (if any)
         chosen = versions[-1]
@@ -79,4 +78,424 @@ def select_version_by_age(age: int, meta_path: Optional[str] = None) -> Dict[str
     if fallback.exists():
         return {"audio_path": str(fallback), "meta": chosen}
 
-    return {"error": "audio_not_found", "audio_path": str(audio_candidate), "meta": chosen}
\ No newline at end of file
+    return {"error": "audio_not_found", "audio_path": str(audio_candidate), "meta": chosen}
+
+# ======================================================================
+# ASYNC HTTP SERVICE
+# ======================================================================
+#
+#   GET  /health
+#   POST /users/<id>/voices?ext=.wav      raw audio body -> ingest result
+#   GET  /users/<id>/playback?age=<n>     playback decision
+#   GET  /users/<id>/timeline             versions + age trajectory
+#   POST /synthesis                       {"user_id", "target_age", "text"} -> 202 job
+#   GET  /synthesis/<job_id>              job status / result
+#   GET  /synthesis/<job_id>/audio        rendered WAV
+#
+# Embedding (ingest) and XTTS (synthesis) run in separate process pools
+# whose workers load their model once at start-up. Each pool admits a
+# bounded number of pending jobs; beyond that the request is answered
+# 503 + Retry-After immediately instead of queueing without limit.
+
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from scripts.config_loader import CONFIG
+
+_API_CFG = CONFIG.get("api", {})
+
+HOST = _API_CFG.get("host", "127.0.0.1")
+PORT = int(_API_CFG.get("port", 8000))
+INGEST_WORKERS = int(_API_CFG.get("ingest_workers", 1))
+INGEST_MAX_PENDING = int(_API_CFG.get("ingest_max_pending", 4))
+SYNTHESIS_WORKERS = int(_API_CFG.get("synthesis_workers", 1))
+SYNTHESIS_MAX_PENDING = int(_API_CFG.get("synthesis_max_pending", 8))
+MAX_UPLOAD_BYTES = int(_API_CFG.get("max_upload_bytes", 50 * 1024 ** 2))
+JOB_TTL_SEC = float(_API_CFG.get("job_ttl_sec", 3600))
+RETRY_AFTER_SEC = 5
+UPLOAD_EXTS = (".wav", ".flac", ".mp3", ".m4a", ".ogg")
+USERS_DIR = BASE_DIR / "users"
+
+_REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large",
+    429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _check_user_id(user_id: str):
+    # user ids become path components (users/<id>/, outputs/<id>_...)
+    if not user_id or user_id.startswith(".") or "/" in user_id or "\\" in user_id:
+        raise HttpError(400, f"Invalid user id {user_id!r}")
+
+
+# ------------------ WORKER PROCESSES ------------------
+
+def _init_ingest_worker():
+    from scripts.embedding_engine import get_embedding_engine
+    get_embedding_engine()._load()
+
+
+def _init_synthesis_worker():
+    from scripts.synthesis_engine import get_synthesis_engine
+    get_synthesis_engine().tts
+
+
+def _ingest_job(user_id: str, audio_path: str) -> dict:
+    """
+    `audio_path` is the upload's permanent home: a stored version keeps
+    pointing at it, so it is only removed when no version was created.
+    """
+    from scripts.process_new_voice import process_new_voice
+    stored = False
+    try:
+        result = process_new_voice(user_id=user_id, audio_path=audio_path)
+        action = (result.get("decision") or {}).get("action")
+        stored = result.get("accepted", False) and action in ("CREATE_BASELINE", "CREATE_VERSION")
+        return result
+    finally:
+        if not stored:
+            try:
+                os.remove(audio_path)
+            except OSError:
+                pass
+
+
+def _synthesis_job(user_id: str, target_age: int, text: str, job_id: str) -> dict:
+    from scripts.playback_service import play_voice
+    return play_voice(user_id=user_id, target_age=target_age, text=text, job_id=job_id)
+
+
+class BoundedPool:
+    """
+    ProcessPoolExecutor with admission control: at most `max_pending`
+    jobs queued or running; submit() raises 503 past that.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int, initializer):
+        self.name = name
+        self.max_pending = max_pending
+        self.pending = 0
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),   # no forked torch state
+            initializer=initializer,
+        )
+
+    def admit(self):
+        """
+        Raises 503 if submit() would be refused. Lets handlers reject
+        before spending anything else (e.g. a rate-limit token).
+        """
+        if self.pending >= self.max_pending:
+            raise HttpError(
+                503, f"{self.name} queue full ({self.pending} pending)",
+                {"Retry-After": str(RETRY_AFTER_SEC)},
+            )
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        self.admit()
+        self.pending += 1
+        fut = asyncio.wrap_future(self.executor.submit(fn, *args))
+        fut.add_done_callback(self._done)
+        return fut
+
+    def _done(self, _):
+        self.pending -= 1
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ------------------ SERVICE ------------------
+
+def _jsonable(obj):
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items() if k != "embedding"}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if hasattr(obj, "item"):      # numpy scalars
+        return obj.item()
+    return obj
+
+
+class VoiceService:
+    def __init__(self):
+        self.ingest = BoundedPool("ingest", INGEST_WORKERS, INGEST_MAX_PENDING, _init_ingest_worker)
+        self.synthesis = BoundedPool("synthesis", SYNTHESIS_WORKERS, SYNTHESIS_MAX_PENDING, _init_synthesis_worker)
+        self.jobs = {}
+
+    def shutdown(self):
+        self.ingest.shutdown()
+        self.synthesis.shutdown()
+
+    # ------------------ ROUTING ------------------
+
+    async def handle(self, method: str, path: str, query: dict, body: bytes):
+        parts = [p for p in path.split("/") if p]
+
+        if parts == ["health"]:
+            return 200, {
+                "status": "ok",
+                "ingest_pending": self.ingest.pending,
+                "synthesis_pending": self.synthesis.pending,
+                "jobs": len(self.jobs),
+            }
+
+        if len(parts) == 3 and parts[0] == "users":
+            user_id, action = parts[1], parts[2]
+            if action == "voices" and method == "POST":
+                return await self.ingest_voice(user_id, query, body)
+            if action == "playback" and method == "GET":
+                return await self.playback_decision(user_id, query)
+            if action == "timeline" and method == "GET":
+                return await self.timeline(user_id)
+
+        if parts[:1] == ["synthesis"]:
+            if len(parts) == 1 and method == "POST":
+                return await self.submit_synthesis(body)
+            if len(parts) == 2 and method == "GET":
+                return self.job_status(parts[1])
+            if len(parts) == 3 and parts[2] == "audio" and method == "GET":
+                return self.job_audio(parts[1])
+
+        raise HttpError(404, f"No route for {method} {path}")
+
+    # ------------------ INGEST ------------------
+
+    async def ingest_voice(self, user_id: str, query: dict, body: bytes):
+        if not body:
+            raise HttpError(400, "Empty audio body")
+
+        _check_user_id(user_id)
+
+        ext = query.get("ext", [".wav"])[0].lower()
+        if not ext.startswith("."):
+            ext = "." + ext
+        if ext not in UPLOAD_EXTS:
+            raise HttpError(400, f"Unsupported extension {ext!r} (allowed: {', '.join(UPLOAD_EXTS)})")
+
+        self.ingest.admit()
+
+        # written straight to its permanent location: an accepted version
+        # stores this path as its audio_path
+        audio_path = USERS_DIR / user_id / "audio" / f"{uuid.uuid4().hex}{ext}"
+
+        def _store():
+            audio_path.parent.mkdir(parents=True, exist_ok=True)
+            audio_path.write_bytes(body)
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _store)
+
+        try:
+            fut = self.ingest.submit(_ingest_job, user_id, str(audio_path))
+        except HttpError:
+            os.remove(audio_path)
+            raise
+        return 200, _jsonable(await fut)
+
+    # ------------------ PLAYBACK / TIMELINE ------------------
+
+    async def playback_decision(self, user_id: str, query: dict):
+        try:
+            age = int(query["age"][0])
+        except (KeyError, ValueError):
+            raise HttpError(400, "Query parameter 'age' (int) is required")
+
+        from scripts.hybrid_playback_decider import decide_playback_mode
+        loop = asyncio.get_running_loop()
+        decision = await loop.run_in_executor(None, decide_playback_mode, user_id, age)
+        return 200, _jsonable(decision)
+
+    async def timeline(self, user_id: str):
+        def _read():
+            from scripts.user_registry import UserRegistry
+            from scripts.age_trajectory import AgeTrajectory
+
+            user = UserRegistry(user_id).data
+            versions = sorted(user["voice_versions"], key=lambda v: v.get("recorded_utc") or "")
+            return {
+                "user_id": user_id,
+                "date_of_birth": user.get("date_of_birth"),
+                "versions": versions,
+                "trajectory": AgeTrajectory(user_id).summary(),
+            }
+
+        loop = asyncio.get_running_loop()
+        return 200, _jsonable(await loop.run_in_executor(None, _read))
+
+    # ------------------ SYNTHESIS JOBS ------------------
+
+    def _expire_jobs(self):
+        """
+        Drops finished jobs older than JOB_TTL_SEC together with the
+        output file each one rendered (RECORDED results point at the
+        user's own recording and are left alone).
+        """
+        cutoff = time.time() - JOB_TTL_SEC
+        for job_id in [j for j, job in self.jobs.items() if job["done"] and job["created"] < cutoff]:
+            job = self.jobs.pop(job_id)
+            audio_path = (job["result"] or {}).get("audio_path")
+            if audio_path and job_id in Path(audio_path).name:
+                try:
+                    os.remove(audio_path)
+                except OSError:
+                    pass
+
+    async def expire_jobs_forever(self, interval: float = 60.0):
+        while True:
+            await asyncio.sleep(interval)
+            self._expire_jobs()
+
+    async def submit_synthesis(self, body: bytes):
+        try:
+            req = json.loads(body or b"{}")
+            user_id = str(req["user_id"])
+            target_age = int(req["target_age"])
+            text = str(req["text"])
+        except (ValueError, KeyError, TypeError):
+            raise HttpError(400, "Body must be JSON with user_id, target_age, text")
+        _check_user_id(user_id)
+
+        # a 503 must not cost the client a rate-limit token
+        self.synthesis.admit()
+
+        from scripts.rate_limiter import check_rate_limit
+        loop = asyncio.get_running_loop()
+        # sqlite backend may wait on a write lock: keep it off the loop
+        rate = await loop.run_in_executor(None, check_rate_limit, user_id)
+        if not rate["allowed"]:
+            raise HttpError(
+                429, "Rate limit exceeded",
+                {"Retry-After": str(rate["reset_in_sec"])},
+            )
+
+        job_id = uuid.uuid4().hex
+        fut = self.synthesis.submit(_synthesis_job, user_id, target_age, text, job_id)
+
+        self._expire_jobs()
+        job = {"created": time.time(), "done": False, "result": None, "error": None}
+        self.jobs[job_id] = job
+
+        def _finish(f):
+            job["done"] = True
+            if f.cancelled():
+                job["error"] = "cancelled"
+            elif f.exception() is not None:
+                job["error"] = str(f.exception())
+            else:
+                job["result"] = _jsonable(f.result())
+
+        fut.add_done_callback(_finish)
+        return 202, {"job_id": job_id, "status": "queued", "remaining": rate["remaining"]}
+
+    def _job(self, job_id: str) -> dict:
+        self._expire_jobs()
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise HttpError(404, f"Unknown job {job_id}")
+        return job
+
+    def job_status(self, job_id: str):
+        job = self._job(job_id)
+        if not job["done"]:
+            status = "pending"
+        elif job["error"] is not None:
+            status = "failed"
+        else:
+            status = "done"
+        return 200, {"job_id": job_id, "status": status, "result": job["result"], "error": job["error"]}
+
+    def job_audio(self, job_id: str):
+        job = self._job(job_id)
+        audio_path = (job["result"] or {}).get("audio_path")
+        if not job["done"] or not audio_path or not Path(audio_path).exists():
+            raise HttpError(404, "Audio not ready")
+        return 200, Path(audio_path)
+
+
+# ------------------ HTTP ------------------
+
+async def _write_response(writer, status: int, payload, headers: Optional[dict] = None):
+    headers = dict(headers or {})
+    if isinstance(payload, Path):
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(None, payload.read_bytes)
+        headers.setdefault("Content-Type", "audio/wav")
+    else:
+        body = json.dumps(payload).encode("utf-8")
+        headers.setdefault("Content-Type", "application/json")
+
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+    head += [f"{k}: {v}" for k, v in headers.items()]
+    head += [f"Content-Length: {len(body)}", "Connection: close", "", ""]
+    writer.write("\r\n".join(head).encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _handle_connection(service: VoiceService, reader, writer):
+    try:
+        request_line = await reader.readline()
+        if not request_line:
+            return
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+
+        length = int(headers.get("content-length", 0) or 0)
+        if length > MAX_UPLOAD_BYTES:
+            raise HttpError(413, f"Body exceeds {MAX_UPLOAD_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        status, payload = await service.handle(method.upper(), url.path, parse_qs(url.query), body)
+        await _write_response(writer, status, payload)
+
+    except HttpError as e:
+        await _write_response(writer, e.status, {"error": str(e)}, e.headers)
+    except (ValueError, asyncio.IncompleteReadError):
+        await _write_response(writer, 400, {"error": "Malformed request"})
+    except Exception as e:
+        await _write_response(writer, 500, {"error": str(e)})
+    finally:
+        writer.close()
+
+
+async def serve(host: str = HOST, port: int = PORT):
+    service = VoiceService()
+    server = await asyncio.start_server(
+        lambda r, w: _handle_connection(service, r, w), host, port
+    )
+    print(f"🎙️ Voice service listening on http://{host}:{port}")
+    expiry = asyncio.create_task(service.expire_jobs_forever(min(60.0, JOB_TTL_SEC)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        expiry.cancel()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
@@ -1,4 +1,5 @@
 import os
+import sys
 import numpy as np
 import torch
 from pathlib import Path
@@ -19,18 +20,17 @@ except Exception:
     # if huggingface_hub not present or patch fails, fallback to normal behavior
     pass
 
-# Use speechbrain to compute ECAPA-TDNN speaker embedding
-# speechbrain.pretrained is deprecated but still works; we keep it for compatibility
-from speechbrain.pretrained import EncoderClassifier
+# ECAPA-TDNN speaker encoder (VoxCeleb-trained) lives in the shared engine,
+# so the model is loaded once per process instead of once per call
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.embedding_engine import get_embedding_engine
 
 def compute_embedding(wav_path, device="cpu"):
-    # load pretrained ECAPA-TDNN speaker encoder (VoxCeleb-trained)
-    classifier = EncoderClassifier.from_hparams(source="speechbrain/spkrec-ecapa-voxceleb",
-                                               run_opts={"device": device},
-                                               savedir="tmp_sbp_spkrec")
-    embeddings = classifier.encode_batch(wav_path)  # returns tensor shape (1, emb_dim)
-    emb = embeddings.squeeze(0).detach().cpu().numpy()
-    return emb
+    # returns L2-normalized embedding, shape (emb_dim,)
+    return get_embedding_engine(device=device).embed(wav_path)
 
 if __name__ == "__main__":
     inp = "preprocessed/test_tone_preproc.wav"
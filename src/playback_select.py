@@ -5,6 +5,12 @@ from datetime import datetime, date
 import argparse
 import sys
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from scripts.age_index import age_index_for, age_index_for_file
+
 def iso_to_date(s):
     return datetime.fromisoformat(s).date()
 
@@ -15,6 +21,13 @@ def compute_age(dob_date, when_date):
     return years
 
 def load_versions(meta_path):
+    """
+    Cached: the CSV is re-parsed only when its mtime/size change.
+    """
+    rows, _ = age_index_for_file(meta_path, _parse_versions)
+    return rows
+
+def _parse_versions(meta_path):
     rows = []
     meta_path = Path(meta_path)
     if not meta_path.exists():
@@ -32,14 +45,7 @@ def load_versions(meta_path):
     return rows
 
 def choose_closest(versions, target_age):
-    best = None
-    best_diff = None
-    for v in versions:
-        diff = abs(v['age_at_recording'] - target_age)
-        if best is None or diff < best_diff:
-            best = v
-            best_diff = diff
-    return best, best_diff
+    return age_index_for(versions).nearest(target_age)
 
 def main(meta_file="versions/versions.csv", age=None, years_from_now=None, dob=None):
     versions = load_versions(meta_file)
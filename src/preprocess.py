@@ -10,28 +10,60 @@ def read_wav(path, sr=16000):
     if audio.ndim > 1:
         audio = audio.mean(axis=1)
     if orig_sr != sr:
-        audio = librosa.resample(audio, orig_sr, sr)
+        audio = librosa.resample(audio, orig_sr=orig_sr, target_sr=sr)
     return audio.astype("float32"), sr
 
 def rms_normalize(audio, target_rms=0.1):
     rms = np.sqrt(np.mean(audio**2) + 1e-8)
     return np.clip(audio * (target_rms / rms), -1.0, 1.0)
 
-def run_vad(audio, sr=16000):
+VAD_FRAME_MS = 30
+VAD_HANGOVER_FRAMES = 3   # keep 90 ms after each voiced frame (word endings)
+
+def vad_frame_len(sr=16000):
+    return int(VAD_FRAME_MS / 1000 * sr)
+
+def vad_mask(audio, sr=16000, hangover=VAD_HANGOVER_FRAMES):
+    """
+    Voiced mask with one bool per complete 30 ms frame. The int16
+    buffer is framed once as a (frames, frame_len) array; only the
+    webrtcvad call itself stays per frame.
+    """
     vad = webrtcvad.Vad(2)
-    frame_len = int(0.03 * sr)  # 30 ms
-    pcm = (audio * 32768).astype("int16")
-    frames = []
+    frame_len = vad_frame_len(sr)
+    n = len(audio) // frame_len
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    pcm = (np.clip(audio[: n * frame_len], -1.0, 1.0) * 32767).astype("int16")
+    frames = pcm.reshape(n, frame_len)
+    data = frames.tobytes()
+    step = frame_len * pcm.itemsize
+    mask = np.fromiter(
+        (vad.is_speech(data[i:i + step], sr) for i in range(0, len(data), step)),
+        dtype=bool,
+        count=n,
+    )
 
-    for i in range(0, len(pcm) - frame_len, frame_len):
-        frame = pcm[i:i+frame_len]
-        if vad.is_speech(frame.tobytes(), sr):
-            frames.append(frame.astype("float32") / 32768.0)
+    if hangover > 0:
+        # frame i stays voiced if any of the previous `hangover` frames was
+        mask = np.convolve(mask, np.ones(hangover + 1), mode="full")[:n] > 0
+    return mask
 
-    if len(frames) == 0:
+def run_vad(audio, sr=16000, mask=None):
+    """
+    Voiced samples of `audio`. Pass a `mask` from vad_mask() to reuse
+    an earlier VAD pass.
+    """
+    if mask is None:
+        mask = vad_mask(audio, sr)
+
+    if not mask.any():
         return audio[: int(sr * 0.5)]
-    
-    return np.concatenate(frames)
+
+    frame_len = vad_frame_len(sr)
+    frames = audio[: len(mask) * frame_len].reshape(len(mask), frame_len)
+    return frames[mask].reshape(-1).astype("float32")
 
 def preprocess(input_path, out_path):
     audio, sr = read_wav(input_path, 16000)